@@ -23,26 +23,75 @@ ARGUMENTS
     --output (optional)
         Directory path for output CSV file. Defaults to script location.
 
+    --no-cache (optional)
+        Disable the on-disk lookup cache (stored in .cache next to the script).
+
 DEPENDENCIES
-    yfinance - Third-party library for fetching stock data from Yahoo Finance.
+    yfinance - Third-party library (1.0 or later) for fetching stock data from Yahoo Finance.
                Handles public holidays implicitly by returning data for the next
                available trading day when a holiday is requested.
     requests - HTTP library for OpenFIGI API calls.
     pandas   - Data manipulation library (used internally by yfinance).
+    orjson   - Optional. Faster JSON parsing for OpenFIGI responses (falls back
+               to the standard json module when not installed).
 """
 
 import argparse
+import collections
 import csv
+import functools
+import hashlib
+import inspect
+import io
+import itertools
+import json
 import math
 import os
-import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
 
 import requests
-import yfinance
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # Optional: faster JSON parsing for OpenFIGI responses
+except ImportError:
+    orjson = None
+
+# yfinance (with pandas and numpy) takes about half a second to import, so it is imported
+# inside the functions that fetch prices; runs that exit early (e.g., on bad arguments) skip it
+
+
+def __getattr__(s_attribute_name: str) -> Any:
+    """
+    Resolve the deferred yfinance import as a module attribute.
+
+    Keeps stock_calculator.yfinance available to callers without importing
+    yfinance when the module is loaded. Mock patch targets must be attributes
+    inside yfinance (e.g., src.stock_calculator.yfinance.Ticker): functions
+    here use a local import, so patching src.stock_calculator.yfinance itself
+    sets a module global that nothing reads.
+
+    Args:
+        s_attribute_name: Name of the missing module attribute.
+
+    Returns:
+        The yfinance module when it is requested.
+
+    Raises:
+        AttributeError: For any other missing attribute.
+    """
+    if s_attribute_name == "yfinance":
+        import yfinance
+        return yfinance
+
+    raise AttributeError(f"module {__name__!r} has no attribute {s_attribute_name!r}")
+
 
 # Exception Classes
 
@@ -61,21 +110,35 @@ class ApiError(Exception):
     pass
 
 
-class StockDelistedError(Exception):
-    """Raised when stock is delisted and has no data."""
-    pass
-
-
 # Constants
 
 DATE_FORMAT: str = "%d-%b-%y"  # Format for date parsing (e.g., 01-Jan-25)
-DATE_PATTERN: str = r"^\d{2}-[A-Za-z]{3}-\d{2}$"  # Regex pattern for date validation
 OPENFIGI_MAPPING_URL: str = "https://api.openfigi.com/v3/mapping"  # OpenFIGI mapping API endpoint (for ISIN lookups)
 OPENFIGI_SEARCH_URL: str = "https://api.openfigi.com/v3/search"  # OpenFIGI search API endpoint (for name lookups)
 DEFAULT_OUTPUT_FILENAME: str = "stock_changes_output.csv"  # Default output file name
 OPENFIGI_BATCH_SIZE: int = 10  # Maximum jobs per OpenFIGI mapping API request (anonymous limit)
-OPENFIGI_MAPPING_DELAY_SECONDS: float = 2.5  # Delay between Mapping API requests (25 req/min limit)
-OPENFIGI_SEARCH_DELAY_SECONDS: float = 13.0  # Delay between Search API requests (5 req/min limit, +1s buffer)
+OPENFIGI_MAPPING_RATE_LIMIT: int = 25  # Maximum Mapping API requests per rate limit period (anonymous limit)
+OPENFIGI_MAPPING_RATE_PERIOD_SECONDS: float = 60.0  # Mapping API rate limit period
+OPENFIGI_MAPPING_MAX_WORKERS: int = 5  # Maximum concurrent Mapping API requests
+OPENFIGI_POOL_SIZE: int = 8  # Keep-alive connections pooled for OpenFIGI (covers concurrent Mapping requests)
+OPENFIGI_MAX_RETRIES: int = 3  # Retries for transient OpenFIGI gateway errors (502/503/504)
+OPENFIGI_SEARCH_RATE_LIMIT: int = 5  # Maximum Search API requests per rate limit period (anonymous limit)
+OPENFIGI_SEARCH_RATE_PERIOD_SECONDS: float = 61.0  # Search API rate limit period (60s, +1s buffer)
+OPENFIGI_SEARCH_MAX_WORKERS: int = 5  # Name lookups in flight (one per Search API slot in the window)
+YFINANCE_BATCH_SIZE: int = 20  # Maximum tickers per yfinance.download request
+PROCESS_STOCK_MAX_WORKERS: int = 8  # Stocks processed concurrently (uncached ones wait on yfinance requests)
+YFINANCE_CANDIDATE_WAVE_SIZE: int = 5  # Search candidates validated per yfinance.download (in priority order)
+YFINANCE_MAX_RETRIES: int = 3  # Retries for Yahoo rate limiting and network errors
+YFINANCE_RETRY_BACKOFF_SECONDS: float = 2.0  # First retry wait, doubled on each further retry
+SCRIPT_DIRECTORY_PATH: str = os.path.dirname(os.path.abspath(__file__))  # Script location (default output and cache directory)
+CACHE_DIRECTORY_NAME: str = ".cache"  # On-disk cache directory name (created next to the script)
+CACHE_TTL_IDENTIFIER_SECONDS: float = 90 * 86400  # TTL for ISIN/name to ticker mappings (effectively immutable)
+CACHE_TTL_HISTORICAL_PRICES_SECONDS: float = 90 * 86400  # TTL for prices whose date window is fully in the past
+CACHE_TTL_RECENT_PRICES_SECONDS: float = 7 * 86400  # TTL for prices whose date window reaches today or later
+CACHE_TTL_OPEN_PRICES_SECONDS: float = 15 * 60  # TTL for prices whose trading day has not closed (live intraday price)
+
+# Days to add to reach the next trading day, indexed by weekday (0=Monday, 6=Sunday)
+TUPLE_N_WEEKEND_OFFSET_DAYS: Tuple[int, ...] = (0, 0, 0, 0, 0, 2, 1)  # Saturday -> Monday (+2), Sunday -> Monday (+1)
 
 # Valid security types for filtering OpenFIGI results
 LIST_S_VALID_SECURITY_TYPES: List[str] = [
@@ -84,6 +147,9 @@ LIST_S_VALID_SECURITY_TYPES: List[str] = [
     "ETP",  # Exchange Traded Products (covers ETFs)
 ]
 
+# Hash set of valid security types for O(1) membership checks (list above is kept for display order)
+SET_S_VALID_SECURITY_TYPES: frozenset = frozenset(LIST_S_VALID_SECURITY_TYPES)
+
 # Exchange priority order for result selection (UK first, US second, rest alphabetically)
 LIST_S_EXCHANGE_PRIORITY: List[str] = [
     "LN",  # London Stock Exchange (UK)
@@ -99,6 +165,9 @@ LIST_S_EXCHANGE_PRIORITY: List[str] = [
     "NA",  # Netherlands (Amsterdam/Euronext)
 ]
 
+# Exchange code to priority rank (lower is preferred), built once from LIST_S_EXCHANGE_PRIORITY
+DICT_EXCHANGE_PRIORITY_INDEX: Dict[str, int] = {s_exchange_code: n_index for n_index, s_exchange_code in enumerate(LIST_S_EXCHANGE_PRIORITY)}
+
 # Exchange code to yfinance suffix mapping
 DICT_EXCHANGE_SUFFIX: Dict[str, str] = {
     "US": "",  # US exchanges (NYSE, NASDAQ)
@@ -114,6 +183,241 @@ DICT_EXCHANGE_SUFFIX: Dict[str, str] = {
 }
 
 
+# Lookup result for a stock whose ticker could not be found or validated (copied, never mutated)
+DICT_NOT_FOUND_RESULT: Dict[str, Any] = {
+    "s_ticker": "",
+    "s_exchange_code": "",
+    "s_full_ticker": "",
+    "b_not_found": True,
+    "b_skipped": False,
+    "n_start_price": None,
+    "n_end_price": None,
+    "s_currency": None
+}
+
+
+# File Cache
+
+class FileCache:
+    """
+    Persistent JSON file cache for API lookups.
+
+    Each entry is stored as <cache directory>/<namespace>/<md5(key)>.json
+    containing {"ts": write time, "ttl_s": time to live, "payload": value}.
+    Entries read or written during a run are also kept in memory, so repeat
+    lookups within the run skip the file read. Unreadable or expired entries
+    are treated as cache misses.
+    """
+
+    def __init__(self, s_cache_directory_path: str) -> None:
+        """
+        Args:
+            s_cache_directory_path: Root directory for cache files.
+        """
+        self.s_cache_directory_path: str = s_cache_directory_path  # Root directory for cache files
+        self.dict_memory_entries: Dict[Tuple[str, str], Dict[str, Any]] = {}  # In-memory copies of entries keyed by (namespace, key)
+
+    def get_entry_path(self, s_namespace: str, s_key: str) -> str:
+        """
+        Build the file path for a cache entry.
+
+        Args:
+            s_namespace: Cache namespace (e.g., "openfigi", "yfinance").
+            s_key: Cache key.
+
+        Returns:
+            Full path to the entry's JSON file.
+        """
+        s_key_hash: str = hashlib.md5(s_key.encode("utf-8")).hexdigest()  # Filesystem-safe key
+
+        return os.path.join(self.s_cache_directory_path, s_namespace, f"{s_key_hash}.json")
+
+    def get(self, s_namespace: str, s_key: str) -> Optional[Any]:
+        """
+        Read a cache entry.
+
+        Args:
+            s_namespace: Cache namespace.
+            s_key: Cache key.
+
+        Returns:
+            Cached payload, or None if the entry is missing, unreadable or expired.
+        """
+        dict_entry: Optional[Dict[str, Any]] = self.dict_memory_entries.get((s_namespace, s_key))  # Entry already loaded this run
+
+        if dict_entry is None:
+            try:
+                with open(self.get_entry_path(s_namespace, s_key), 'r', encoding='utf-8') as file_entry:
+                    dict_entry = json.load(file_entry)
+            except (OSError, ValueError):
+                return None
+
+            self.dict_memory_entries[(s_namespace, s_key)] = dict_entry
+
+        if time.time() - dict_entry.get("ts", 0) >= dict_entry.get("ttl_s", 0):
+            return None
+
+        return dict_entry.get("payload")
+
+    def set(self, s_namespace: str, s_key: str, payload: Any, n_ttl_seconds: float) -> None:
+        """
+        Write a cache entry. Write failures are ignored (caching is best effort).
+
+        Args:
+            s_namespace: Cache namespace.
+            s_key: Cache key.
+            payload: JSON-serialisable value to store.
+            n_ttl_seconds: Time to live in seconds.
+        """
+        s_entry_path: str = self.get_entry_path(s_namespace, s_key)  # Final entry path
+        s_temp_path: str = f"{s_entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Temporary path for atomic replace (unique per thread)
+        dict_entry: Dict[str, Any] = {"ts": time.time(), "ttl_s": n_ttl_seconds, "payload": payload}  # Entry to store
+
+        self.dict_memory_entries[(s_namespace, s_key)] = dict_entry
+
+        try:
+            os.makedirs(os.path.dirname(s_entry_path), exist_ok=True)
+            with open(s_temp_path, 'w', encoding='utf-8') as file_entry:
+                json.dump(dict_entry, file_entry)
+            os.replace(s_temp_path, s_entry_path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+
+FILE_CACHE: Optional[FileCache] = None  # Active on-disk cache (enabled by main(), disabled by default)
+
+
+def disk_cached(s_namespace: str, fn_ttl_seconds: Callable[..., float], fn_is_cacheable: Callable[[Any], bool]) -> Callable:
+    """
+    Decorator that serves results from FILE_CACHE when it is enabled.
+
+    The cache key is built from the function name and its arguments, bound to
+    the function signature so positional and keyword calls share an entry. On
+    a miss the wrapped function is called and its result stored if
+    fn_is_cacheable accepts it (e.g., only successful lookups are cached).
+
+    Args:
+        s_namespace: Cache namespace for the wrapped function.
+        fn_ttl_seconds: Called with the wrapped function's arguments, returns TTL in seconds.
+        fn_is_cacheable: Called with the result, returns True if it should be stored.
+
+    Returns:
+        Decorator for the function to cache.
+    """
+    def decorator(fn_wrapped: Callable) -> Callable:
+        signature_wrapped: inspect.Signature = inspect.signature(fn_wrapped)  # Signature used to normalise call arguments
+
+        @functools.wraps(fn_wrapped)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if FILE_CACHE is None:
+                return fn_wrapped(*args, **kwargs)
+
+            bound_arguments: inspect.BoundArguments = signature_wrapped.bind(*args, **kwargs)  # Arguments by parameter name
+            bound_arguments.apply_defaults()
+            s_key: str = json.dumps([fn_wrapped.__name__, list(bound_arguments.arguments.items())], default=str)  # Cache key
+
+            cached_payload: Optional[Any] = FILE_CACHE.get(s_namespace, s_key)  # Cached result if present
+            if cached_payload is not None:
+                return cached_payload
+
+            result: Any = fn_wrapped(*args, **kwargs)  # Fresh result
+
+            if fn_is_cacheable(result):
+                FILE_CACHE.set(s_namespace, s_key, result, fn_ttl_seconds(*args, **kwargs))
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def get_identifier_cache_ttl_seconds(*args: Any, **kwargs: Any) -> float:
+    """
+    Get the cache TTL for identifier lookups (ISIN/name to ticker).
+
+    Returns:
+        TTL in seconds.
+    """
+    return CACHE_TTL_IDENTIFIER_SECONDS
+
+
+def get_price_cache_ttl_seconds(s_identifier: str, s_start_date: str, s_end_date: str) -> float:
+    """
+    Get the cache TTL for price lookups based on how recent the end date is.
+
+    Closing prices for a date window that is fully in the past do not change,
+    so they are kept much longer than prices for a window reaching today. A
+    start or end date (after weekend adjustment) of today or later has no
+    closing price yet, so Yahoo's live price is only kept for minutes.
+
+    Args:
+        s_identifier: Ticker or stock name (unused, matches the cached function signature).
+        s_start_date: Start date string in dd-mmm-yy format.
+        s_end_date: End date string in dd-mmm-yy format.
+
+    Returns:
+        TTL in seconds.
+    """
+    dt_now: datetime = datetime.now()  # Current time
+    dt_end_window_end: datetime = parse_date(s_end_date) + timedelta(days=7)  # End of end-date window (weekend + holidays)
+
+    if dt_end_window_end < dt_now:
+        return CACHE_TTL_HISTORICAL_PRICES_SECONDS
+
+    dt_latest: datetime = max(parse_date(adjust_to_trading_day(s_start_date)), parse_date(adjust_to_trading_day(s_end_date)))  # Latest trading day priced
+    if dt_latest >= datetime(dt_now.year, dt_now.month, dt_now.day):
+        return CACHE_TTL_OPEN_PRICES_SECONDS
+
+    return CACHE_TTL_RECENT_PRICES_SECONDS
+
+
+# Rate Limiting
+
+class RateLimiter:
+    """
+    Thread-safe sliding window rate limiter.
+
+    Allows at most n_max_requests calls to acquire() within any
+    n_period_seconds window; further calls block until a slot frees up.
+    """
+
+    def __init__(self, n_max_requests: int, n_period_seconds: float) -> None:
+        """
+        Args:
+            n_max_requests: Maximum requests allowed per period.
+            n_period_seconds: Length of the sliding window in seconds.
+        """
+        self.n_max_requests: int = n_max_requests  # Maximum requests per period
+        self.n_period_seconds: float = n_period_seconds  # Sliding window length
+        self.deque_n_request_times: Deque[float] = collections.deque()  # Monotonic times of requests in the window
+        self.lock: threading.Lock = threading.Lock()  # Guards deque_n_request_times
+
+    def acquire(self) -> None:
+        """
+        Block until a request may be made, then record it.
+        """
+        while True:
+            with self.lock:
+                n_now: float = time.monotonic()  # Current monotonic time
+
+                # Drop requests that have left the window
+                while self.deque_n_request_times and n_now - self.deque_n_request_times[0] >= self.n_period_seconds:
+                    self.deque_n_request_times.popleft()
+
+                if len(self.deque_n_request_times) < self.n_max_requests:
+                    self.deque_n_request_times.append(n_now)
+                    return
+
+                n_wait_seconds: float = self.n_period_seconds - (n_now - self.deque_n_request_times[0])  # Until oldest expires
+
+            time.sleep(n_wait_seconds)
+
+
+OPENFIGI_MAPPING_RATE_LIMITER: RateLimiter = RateLimiter(OPENFIGI_MAPPING_RATE_LIMIT, OPENFIGI_MAPPING_RATE_PERIOD_SECONDS)  # Shared Mapping API limiter
+OPENFIGI_SEARCH_RATE_LIMITER: RateLimiter = RateLimiter(OPENFIGI_SEARCH_RATE_LIMIT, OPENFIGI_SEARCH_RATE_PERIOD_SECONDS)  # Shared Search API limiter
+
+
 # CSV Parsing Functions
 
 def parse_csv_file(s_input_file_path: str) -> Dict[str, Any]:
@@ -132,59 +436,55 @@ def parse_csv_file(s_input_file_path: str) -> Dict[str, Any]:
     Raises:
         CsvParsingError: If file structure is invalid or dates are missing/malformed.
     """
-    list_list_rows: List[List[str]] = []  # Raw rows from CSV file
+    list_dict_stocks: List[Dict[str, str]] = []  # List of stock dictionaries
 
-    # Read CSV file
+    # Stream CSV file in a single pass (rows are not buffered)
     with open(s_input_file_path, 'r', encoding='utf-8') as file_input:
         reader_csv = csv.reader(file_input)
-        # Loop through each row in the CSV file
+
+        # Rows 1-4 are the dates row, blank row, "Stocks" header and column headers
+        list_list_s_header_rows: List[List[str]] = list(itertools.islice(reader_csv, 4))  # Fixed header rows
+        list_s_first_row: List[str] = list_list_s_header_rows[0] if list_list_s_header_rows else []  # First row containing dates (validated once the row count is known)
+        n_row_count: int = len(list_list_s_header_rows)  # Number of rows read
+
+        # Loop through each stock row (header rows already consumed, so no per-row index checks)
         for list_row in reader_csv:
-            list_list_rows.append(list_row)
+            n_row_count += 1
+
+            # Skip empty rows
+            if not list_row or not list_row[0].strip():
+                continue
+
+            s_name: str = list_row[0].strip()  # Stock name
+            s_ticker: str = list_row[1].strip() if len(list_row) > 1 else ""  # Stock ticker
+            s_isin: str = list_row[2].strip() if len(list_row) > 2 else ""  # Stock ISIN
+
+            list_dict_stocks.append({"s_name": s_name, "s_ticker": s_ticker, "s_isin": s_isin})
 
     # Validate minimum row count
-    if len(list_list_rows) < 5:
+    if n_row_count < 5:
         raise CsvParsingError("Invalid CSV structure. Missing required rows including date row.")
 
     # Parse dates from row 1
-    list_first_row: List[str] = list_list_rows[0]  # First row containing dates
-
-    if len(list_first_row) < 4:
+    if len(list_s_first_row) < 4:
         raise CsvParsingError("Missing Start Date or End Date in row 1.")
 
-    s_start_date_label: str = list_first_row[0].strip()  # Should be "Start Date"
-    s_start_date: str = list_first_row[1].strip()  # Start date value
-    s_end_date_label: str = list_first_row[2].strip()  # Should be "End Date"
-    s_end_date: str = list_first_row[3].strip()  # End date value
+    s_start_date_label: str = list_s_first_row[0].strip()  # Should be "Start Date"
+    s_start_date: str = list_s_first_row[1].strip()  # Start date value
+    s_end_date_label: str = list_s_first_row[2].strip()  # Should be "End Date"
+    s_end_date: str = list_s_first_row[3].strip()  # End date value
 
     # Validate date labels
     if s_start_date_label.lower() != "start date" or s_end_date_label.lower() != "end date":
         raise CsvParsingError("Missing Start Date or End Date labels in row 1.")
 
     # Validate date format
-    if not re.match(DATE_PATTERN, s_start_date):
+    if not validate_date_format(s_start_date):
         raise CsvParsingError(f"Invalid date format for Start Date. Expected dd-mmm-yy (e.g., 01-Jan-25), got: {s_start_date}")
 
-    if not re.match(DATE_PATTERN, s_end_date):
+    if not validate_date_format(s_end_date):
         raise CsvParsingError(f"Invalid date format for End Date. Expected dd-mmm-yy (e.g., 01-Jan-25), got: {s_end_date}")
 
-    # Parse stocks from row 5 onwards (index 4+)
-    list_dict_stocks: List[Dict[str, str]] = []  # List of stock dictionaries
-
-    # Loop through each stock row starting from row 5
-    for n_row_index in range(4, len(list_list_rows)):
-        list_stock_row: List[str] = list_list_rows[n_row_index]  # Current stock row
-
-        # Skip empty rows
-        if not list_stock_row or not list_stock_row[0].strip():
-            continue
-
-        s_name: str = list_stock_row[0].strip() if len(list_stock_row) > 0 else ""  # Stock name
-        s_ticker: str = list_stock_row[1].strip() if len(list_stock_row) > 1 else ""  # Stock ticker
-        s_isin: str = list_stock_row[2].strip() if len(list_stock_row) > 2 else ""  # Stock ISIN
-
-        dict_stock: Dict[str, str] = {"s_name": s_name, "s_ticker": s_ticker, "s_isin": s_isin}
-        list_dict_stocks.append(dict_stock)
-
     # Validate stock list is not empty
     if len(list_dict_stocks) == 0:
         raise CsvParsingError("No stocks found in file. Stock list is empty.")
@@ -200,13 +500,36 @@ def validate_date_format(s_date: str) -> bool:
     """
     Validate that a date string matches the expected format.
 
+    The shape is fixed (dd-mmm-yy, e.g., 01-Jan-25), so the fields are
+    checked directly rather than through the regex engine. Dates with a valid
+    shape are then parsed once with parse_date, which rejects impossible dates
+    (e.g., 31-Feb-25) and memoises the result for every later use.
+
     Args:
         s_date: Date string to validate.
 
     Returns:
         True if valid, False otherwise.
     """
-    return bool(re.match(DATE_PATTERN, s_date))
+    b_valid_shape: bool = (
+        len(s_date) == 9 and
+        s_date.isascii() and
+        s_date[0:2].isdigit() and
+        s_date[2] == "-" and
+        s_date[3:6].isalpha() and
+        s_date[6] == "-" and
+        s_date[7:9].isdigit()
+    )  # True if the string has the dd-mmm-yy shape
+
+    if not b_valid_shape:
+        return False
+
+    try:
+        parse_date(s_date)
+    except ValueError:
+        return False
+
+    return True
 
 
 def parse_arguments(list_s_args: List[str]) -> Dict[str, Any]:
@@ -229,6 +552,7 @@ def parse_arguments(list_s_args: List[str]) -> Dict[str, Any]:
     parser_args.add_argument("--start", dest="s_start_date", type=str, help="Start date (dd-mmm-yy)")
     parser_args.add_argument("--end", dest="s_end_date", type=str, help="End date (dd-mmm-yy)")
     parser_args.add_argument("--output", dest="s_output_directory_path", type=str, help="Output directory path")
+    parser_args.add_argument("--no-cache", dest="b_no_cache", action="store_true", help="Disable the on-disk lookup cache")
 
     try:
         namespace_args = parser_args.parse_args(list_s_args)
@@ -240,6 +564,7 @@ def parse_arguments(list_s_args: List[str]) -> Dict[str, Any]:
     s_start_date: Optional[str] = namespace_args.s_start_date  # Start date
     s_end_date: Optional[str] = namespace_args.s_end_date  # End date
     s_output_directory_path: Optional[str] = namespace_args.s_output_directory_path  # Output directory
+    b_no_cache: bool = namespace_args.b_no_cache  # True to disable the on-disk cache
 
     # Check for missing required arguments
     if not s_input_file_path and not s_stocks:
@@ -262,7 +587,7 @@ def parse_arguments(list_s_args: List[str]) -> Dict[str, Any]:
         if not validate_date_format(s_end_date):
             raise CliArgumentError(f"Invalid date format for --end. Expected dd-mmm-yy (e.g., 01-Jan-25), got: {s_end_date}")
 
-    dict_args: Dict[str, Any] = {"s_input_file_path": s_input_file_path, "s_stocks": s_stocks, "s_start_date": s_start_date, "s_end_date": s_end_date, "s_output_directory_path": s_output_directory_path}
+    dict_args: Dict[str, Any] = {"s_input_file_path": s_input_file_path, "s_stocks": s_stocks, "s_start_date": s_start_date, "s_end_date": s_end_date, "s_output_directory_path": s_output_directory_path, "b_no_cache": b_no_cache}
 
     return dict_args
 
@@ -305,8 +630,96 @@ def sanitise_ticker(s_ticker_raw: str) -> str:
     return s_ticker_sanitised
 
 
+# ISIN Validation Functions
+
+def validate_isin(s_isin: str) -> bool:
+    """
+    Check that an ISIN is well formed and its check digit is correct.
+
+    A malformed ISIN (e.g., a typo in the input file) can never match on
+    OpenFIGI, so checking it locally saves a Mapping API request.
+
+    Args:
+        s_isin: ISIN to check (e.g., "US0378331005"). Case is ignored.
+
+    Returns:
+        True if the ISIN is 2 letters, 9 letters or digits and a check digit that
+        passes the Luhn check, False otherwise.
+    """
+    s_isin_upper: str = s_isin.upper()  # ISIN in upper case
+
+    # Check shape: country code, national identifier, check digit
+    if len(s_isin_upper) != 12 or not s_isin_upper.isascii():
+        return False
+    if not (s_isin_upper[:2].isalpha() and s_isin_upper[2:11].isalnum() and s_isin_upper[11].isdigit()):
+        return False
+
+    # Expand letters to two digits (A=10 ... Z=35), then apply the Luhn check
+    s_digits: str = "".join(str(int(s_character, 36)) for s_character in s_isin_upper)  # ISIN as digits only
+    n_checksum: int = 0  # Luhn checksum
+
+    # Loop through digits from the right, doubling every second one
+    for n_position, s_digit in enumerate(reversed(s_digits)):
+        n_digit: int = int(s_digit)  # Digit value
+
+        if n_position % 2 == 1:
+            n_digit *= 2
+            if n_digit > 9:
+                n_digit -= 9
+
+        n_checksum += n_digit
+
+    return n_checksum % 10 == 0
+
+
 # OpenFIGI Lookup Functions
 
+def create_openfigi_session() -> requests.Session:
+    """
+    Create the HTTP session shared by all OpenFIGI requests.
+
+    The session keeps TLS connections alive between requests and retries
+    transient gateway errors with backoff. OpenFIGI requests are read-only,
+    so POST is safe to retry.
+
+    Returns:
+        Configured requests Session.
+    """
+    session_openfigi: requests.Session = requests.Session()  # Shared OpenFIGI session
+    session_openfigi.headers.update({"Content-Type": "application/json"})
+
+    retry_policy: Retry = Retry(
+        total=OPENFIGI_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["POST"],
+        raise_on_status=False
+    )  # Retry policy for transient errors
+    session_openfigi.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=OPENFIGI_POOL_SIZE, max_retries=retry_policy))
+
+    return session_openfigi
+
+
+OPENFIGI_SESSION: requests.Session = create_openfigi_session()  # Shared keep-alive session for OpenFIGI requests
+
+
+def parse_json_response(response_api: requests.Response) -> Any:
+    """
+    Parse a JSON response body, using orjson when it is installed.
+
+    Args:
+        response_api: HTTP response with a JSON body.
+
+    Returns:
+        Parsed JSON value (dict or list).
+    """
+    if orjson is not None:
+        return orjson.loads(response_api.content)
+
+    return json.loads(response_api.content)
+
+
+@disk_cached("openfigi", get_identifier_cache_ttl_seconds, lambda dict_result: not dict_result.get("b_not_found", True))
 def lookup_ticker_from_openfigi(s_stock_name: str = "", s_isin: str = "") -> Dict[str, Any]:
     """
     Look up stock ticker using Bloomberg OpenFIGI API.
@@ -330,14 +743,16 @@ def lookup_ticker_from_openfigi(s_stock_name: str = "", s_isin: str = "") -> Dic
     if not s_stock_name and not s_isin:
         raise ValueError("Either s_stock_name or s_isin must be provided to lookup_ticker_from_openfigi()")
 
-    dict_headers: Dict[str, str] = {"Content-Type": "application/json"}  # HTTP request headers
-
     if s_isin:
+        # A malformed ISIN cannot match, so skip the request
+        if not validate_isin(s_isin):
+            return {"s_ticker": "", "s_exchange_code": "", "b_not_found": True}
+
         # Use Mapping API for ISIN lookup
         list_dict_api_query: List[Dict[str, str]] = [{"idType": "ID_ISIN", "idValue": s_isin}]
 
         try:
-            response_api = requests.post(OPENFIGI_MAPPING_URL, json=list_dict_api_query, headers=dict_headers, timeout=30)
+            response_api = OPENFIGI_SESSION.post(OPENFIGI_MAPPING_URL, json=list_dict_api_query, timeout=30)
         except Exception as e:
             raise ApiError(f"OpenFIGI API unreachable. Error: {str(e)}")
 
@@ -347,7 +762,7 @@ def lookup_ticker_from_openfigi(s_stock_name: str = "", s_isin: str = "") -> Dic
         if response_api.status_code != 200:
             raise ApiError(f"OpenFIGI API returned error status: {response_api.status_code}")
 
-        list_dict_response: List[Dict[str, Any]] = response_api.json()  # API response data
+        list_dict_response: List[Dict[str, Any]] = parse_json_response(response_api)  # API response data
 
         # Check for no match
         if not list_dict_response or "warning" in list_dict_response[0] or "error" in list_dict_response[0]:
@@ -369,7 +784,7 @@ def lookup_ticker_from_openfigi(s_stock_name: str = "", s_isin: str = "") -> Dic
     dict_query: Dict[str, str] = {"query": s_stock_name}
 
     try:
-        response_api = requests.post(OPENFIGI_SEARCH_URL, json=dict_query, headers=dict_headers, timeout=30)
+        response_api = OPENFIGI_SESSION.post(OPENFIGI_SEARCH_URL, json=dict_query, timeout=30)
     except Exception as e:
         raise ApiError(f"OpenFIGI API unreachable. Error: {str(e)}")
 
@@ -379,7 +794,7 @@ def lookup_ticker_from_openfigi(s_stock_name: str = "", s_isin: str = "") -> Dic
     if response_api.status_code != 200:
         raise ApiError(f"OpenFIGI API returned error status: {response_api.status_code}")
 
-    dict_response: Dict[str, Any] = response_api.json()  # API response data
+    dict_response: Dict[str, Any] = parse_json_response(response_api)  # API response data
 
     # Check for no match
     if "data" not in dict_response or len(dict_response.get("data", [])) == 0:
@@ -404,15 +819,16 @@ def select_and_validate_best_result(
     Select the best result from OpenFIGI Search API and validate it exists in yfinance.
 
     Uses AND filter logic with exchange priority ordering:
-    1. Loop through exchanges in priority order (UK first, US second, rest alphabetically)
-    2. For each exchange, loop through all results
-    3. When a result matches ALL filter conditions:
+    1. Loop through all results once
+    2. When a result matches ALL filter conditions, bucket it by its exchange priority:
        - Security type is valid (Common Stock, REIT, or ETP)
-       - Exchange code matches current priority exchange
+       - Exchange code is in the priority list (UK first, US second, rest alphabetically)
        - Search query appears in the result name
-    4. Validate the ticker exists in yfinance by fetching price data
-    5. If valid, return the result with cached prices
-    6. If invalid, continue to next exchange in priority order
+    3. Order candidates by exchange priority (results on the same exchange keep API order)
+    4. Fetch prices for the top YFINANCE_CANDIDATE_WAVE_SIZE candidates with one
+       batched yfinance download, moving on to the next wave only if none is valid
+    5. Return the highest priority candidate that has price data, with cached prices
+       and its currency (fetched for the winning ticker only)
 
     Args:
         list_dict_api_results: List of result dictionaries from OpenFIGI Search API.
@@ -425,62 +841,83 @@ def select_and_validate_best_result(
         If valid, includes: ticker, exchCode, name, s_full_ticker, n_start_price, n_end_price, s_currency
     """
     s_search_query_lowercase: str = s_search_query.lower()  # Lowercase search query for case-insensitive matching
-
-    # Loop through exchanges in priority order
-    for s_priority_exchange_code in LIST_S_EXCHANGE_PRIORITY:
-        # Loop through all API results for current exchange
-        for dict_api_result in list_dict_api_results:
-            s_security_type: str = dict_api_result.get("securityType", "")  # Primary security type
-            s_security_type2: str = dict_api_result.get("securityType2", "")  # Secondary security type
-            s_exchange_code: str = dict_api_result.get("exchCode", "")  # Exchange code
-            s_result_name: str = dict_api_result.get("name", "")  # Result name
-            s_result_name_lowercase: str = s_result_name.lower()  # Lowercase name for matching
-
-            # Check ALL filter conditions (AND logic)
-            b_has_valid_security_type: bool = (
-                s_security_type in LIST_S_VALID_SECURITY_TYPES or
-                s_security_type2 in LIST_S_VALID_SECURITY_TYPES
-            )  # True if security type is valid
-            b_matches_priority_exchange: bool = (s_exchange_code == s_priority_exchange_code)  # True if exchange matches current priority
-            b_query_in_name: bool = (s_search_query_lowercase in s_result_name_lowercase)  # True if query appears in name
-
-            if b_has_valid_security_type and b_matches_priority_exchange and b_query_in_name:
-                # Build full ticker with exchange suffix
-                s_ticker_raw: str = dict_api_result.get("ticker", "")  # Raw ticker from API
-                s_ticker_sanitised: str = sanitise_ticker(s_ticker_raw)  # Sanitised ticker
-                s_exchange_suffix: str = map_exchange_to_suffix(s_exchange_code)  # Exchange suffix for yfinance
-                s_full_ticker: str = s_ticker_sanitised + s_exchange_suffix  # Full ticker with suffix
-
-                # Validate ticker exists in yfinance by fetching prices
-                dict_validation: Dict[str, Any] = validate_ticker_and_fetch_prices(
-                    s_full_ticker,
-                    s_start_date,
-                    s_end_date
-                )  # Validation result with cached prices
-
-                if dict_validation.get("b_valid", False):
-                    # Return API result with cached prices
-                    return {
-                        "ticker": s_ticker_sanitised,
-                        "exchCode": s_exchange_code,
-                        "name": s_result_name,
-                        "s_full_ticker": s_full_ticker,
-                        "n_start_price": dict_validation.get("n_start_price"),
-                        "n_end_price": dict_validation.get("n_end_price"),
-                        "s_currency": dict_validation.get("s_currency")
-                    }
-                # If validation failed, continue to next exchange in priority order
+    list_tuple_candidates: List[Tuple[int, Dict[str, str]]] = []  # (priority index, candidate) pairs
+
+    # Loop through all API results once
+    for dict_api_result in list_dict_api_results:
+        s_exchange_code: str = dict_api_result.get("exchCode", "")  # Exchange code
+        n_priority_index: Optional[int] = DICT_EXCHANGE_PRIORITY_INDEX.get(s_exchange_code)  # Exchange priority (None if unsupported)
+
+        # Check ALL filter conditions (AND logic), cheapest first so most results are rejected early
+        if n_priority_index is None:
+            continue  # Exchange is not in the priority list
+
+        if (
+            dict_api_result.get("securityType", "") not in SET_S_VALID_SECURITY_TYPES and
+            dict_api_result.get("securityType2", "") not in SET_S_VALID_SECURITY_TYPES
+        ):
+            continue  # Neither security type is valid
+
+        s_result_name: str = dict_api_result.get("name", "")  # Result name
+
+        if s_search_query_lowercase in s_result_name.lower():
+            # Build full ticker with exchange suffix
+            s_ticker_raw: str = dict_api_result.get("ticker", "")  # Raw ticker from API
+            s_ticker_sanitised: str = sanitise_ticker(s_ticker_raw)  # Sanitised ticker
+            s_exchange_suffix: str = DICT_EXCHANGE_SUFFIX.get(s_exchange_code, "")  # Exchange suffix for yfinance
+            s_full_ticker: str = s_ticker_sanitised + s_exchange_suffix  # Full ticker with suffix
+
+            list_tuple_candidates.append((n_priority_index, {
+                "ticker": s_ticker_sanitised,
+                "exchCode": s_exchange_code,
+                "name": s_result_name,
+                "s_full_ticker": s_full_ticker
+            }))
+
+    # Order by exchange priority (stable sort keeps API order within an exchange)
+    list_tuple_candidates.sort(key=lambda tuple_candidate: tuple_candidate[0])
+    list_dict_candidates: List[Dict[str, str]] = [dict_candidate for _, dict_candidate in list_tuple_candidates]  # Filtered candidates in priority order
+
+    if not list_dict_candidates:
+        return None  # No result passed the filter
+
+    # Validate candidates in priority-ordered waves, one batched download per wave
+    for n_wave_start in range(0, len(list_dict_candidates), YFINANCE_CANDIDATE_WAVE_SIZE):
+        list_dict_wave: List[Dict[str, str]] = list_dict_candidates[n_wave_start:n_wave_start + YFINANCE_CANDIDATE_WAVE_SIZE]  # Candidates in this wave
+        list_s_wave_tickers: List[str] = [dict_candidate["s_full_ticker"] for dict_candidate in list_dict_wave]  # Tickers to validate
+        dict_dict_prices: Dict[str, Dict[str, Any]] = fetch_prices_batch(list_s_wave_tickers, s_start_date, s_end_date)  # Prices keyed by ticker
+
+        # Walk the wave in priority order, the first valid candidate wins
+        for dict_candidate in list_dict_wave:
+            dict_validation: Dict[str, Any] = dict_dict_prices.get(dict_candidate["s_full_ticker"], {})  # Validation result with cached prices
+
+            if dict_validation.get("b_valid", False):
+                s_currency: str = fetch_stock_currency(dict_candidate["s_full_ticker"])  # Currency for the winning ticker
+
+                # Return API result with cached prices
+                return {
+                    "ticker": dict_candidate["ticker"],
+                    "exchCode": dict_candidate["exchCode"],
+                    "name": dict_candidate["name"],
+                    "s_full_ticker": dict_candidate["s_full_ticker"],
+                    "n_start_price": dict_validation.get("n_start_price"),
+                    "n_end_price": dict_validation.get("n_end_price"),
+                    "s_currency": s_currency
+                }
+            # If validation failed, continue to next candidate in priority order
 
     return None  # No valid result found
 
 
+@disk_cached("openfigi", get_price_cache_ttl_seconds, lambda dict_result: not dict_result.get("b_not_found", True))
 def resolve_ticker_with_prices(s_stock_name: str, s_start_date: str, s_end_date: str) -> Dict[str, Any]:
     """
     Resolve a stock ticker using OpenFIGI Search API and validate with yfinance.
 
-    Uses exchange priority algorithm to select the best result. Each candidate
-    ticker is validated against yfinance by fetching price data. If valid,
-    the prices are cached in the result to avoid duplicate API calls later.
+    Uses exchange priority algorithm to select the best result. Candidate
+    tickers are filtered locally, then validated against yfinance with batched
+    price downloads. If valid, the prices are cached in the result to avoid
+    duplicate API calls later.
 
     Args:
         s_stock_name: Company name to search.
@@ -500,11 +937,13 @@ def resolve_ticker_with_prices(s_stock_name: str, s_start_date: str, s_end_date:
     Raises:
         ApiError: If API is unreachable or returns an error.
     """
-    dict_headers: Dict[str, str] = {"Content-Type": "application/json"}  # HTTP request headers
     dict_query: Dict[str, str] = {"query": s_stock_name}  # Search query
 
+    # Wait for a Search API slot (yfinance validation below runs outside the limiter)
+    OPENFIGI_SEARCH_RATE_LIMITER.acquire()
+
     try:
-        response_api = requests.post(OPENFIGI_SEARCH_URL, json=dict_query, headers=dict_headers, timeout=30)
+        response_api = OPENFIGI_SESSION.post(OPENFIGI_SEARCH_URL, json=dict_query, timeout=30)
     except Exception as e:
         raise ApiError(f"OpenFIGI API unreachable. Error: {str(e)}")
 
@@ -526,7 +965,7 @@ def resolve_ticker_with_prices(s_stock_name: str, s_start_date: str, s_end_date:
     if response_api.status_code != 200:
         raise ApiError(f"OpenFIGI API returned error status: {response_api.status_code}")
 
-    dict_response: Dict[str, Any] = response_api.json()  # API response data
+    dict_response: Dict[str, Any] = parse_json_response(response_api)  # API response data
 
     # Check for no results from API
     if "data" not in dict_response or len(dict_response.get("data", [])) == 0:
@@ -561,6 +1000,66 @@ def resolve_ticker_with_prices(s_stock_name: str, s_start_date: str, s_end_date:
     }
 
 
+def post_openfigi_mapping_batch(list_dict_api_query: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Send one batch of jobs to the OpenFIGI Mapping API.
+
+    Waits on OPENFIGI_MAPPING_RATE_LIMITER first, so batches can be issued
+    from several threads at once without exceeding the rate limit. A 429
+    response is retried (up to OPENFIGI_MAX_RETRIES times) after the wait
+    given in its ratelimit-reset header.
+
+    Args:
+        list_dict_api_query: Mapping API jobs (at most OPENFIGI_BATCH_SIZE).
+
+    Returns:
+        List of API response entries, one per job in the same order.
+
+    Raises:
+        ApiError: If API is unreachable, rate limited or returns an error.
+    """
+    # Loop until the batch is accepted or the rate limit retries are used up
+    for n_attempt in range(OPENFIGI_MAX_RETRIES + 1):
+        OPENFIGI_MAPPING_RATE_LIMITER.acquire()
+
+        try:
+            response_api = OPENFIGI_SESSION.post(OPENFIGI_MAPPING_URL, json=list_dict_api_query, timeout=30)
+        except Exception as e:
+            raise ApiError(f"OpenFIGI API unreachable. Error: {str(e)}")
+
+        if response_api.status_code != 429:
+            break
+
+        # Extract rate limit headers for debugging
+        s_rate_limit: str = response_api.headers.get("ratelimit-limit", "unknown")  # Max requests allowed
+        s_rate_remaining: str = response_api.headers.get("ratelimit-remaining", "unknown")  # Requests remaining
+        s_rate_reset: str = response_api.headers.get("ratelimit-reset", "unknown")  # Seconds until reset
+
+        # Wait for the window to reset and retry, unless the wait is unknown or longer than one period
+        try:
+            n_reset_seconds: float = float(s_rate_reset)  # Seconds until reset
+        except (TypeError, ValueError):
+            n_reset_seconds = -1.0
+
+        if n_attempt == OPENFIGI_MAX_RETRIES or not 0 <= n_reset_seconds <= OPENFIGI_MAPPING_RATE_PERIOD_SECONDS:
+            s_error_message: str = (
+                f"OpenFIGI Mapping API rate limit exceeded.\n"
+                f"  Endpoint: {OPENFIGI_MAPPING_URL}\n"
+                f"  Rate Limit: {s_rate_limit} requests\n"
+                f"  Remaining: {s_rate_remaining}\n"
+                f"  Reset in: {s_rate_reset} seconds\n"
+                f"Please wait and try again."
+            )
+            raise ApiError(s_error_message)
+
+        time.sleep(n_reset_seconds)
+
+    if response_api.status_code != 200:
+        raise ApiError(f"OpenFIGI API returned error status: {response_api.status_code}")
+
+    return parse_json_response(response_api)
+
+
 def resolve_tickers_batch_with_prices(
     list_dict_stocks: List[Dict[str, str]],
     s_start_date: str,
@@ -570,12 +1069,13 @@ def resolve_tickers_batch_with_prices(
     Resolve multiple stock tickers using Bloomberg OpenFIGI API and validate with yfinance.
 
     Uses the Mapping API (with batching) for ISIN lookups and the Search API for name lookups.
-    The Search API does not support batching, so name lookups are done one at a time with delays.
+    The Search API does not support batching, so name lookups run concurrently, up to
+    5 requests per minute, with yfinance validation overlapping the rate limit wait.
     All resolved tickers are validated against yfinance, and prices are cached.
 
     Args:
-        list_dict_stocks: List of stock dictionaries with s_name, s_ticker, s_isin keys.
-                          Only stocks without a ticker will be looked up.
+        list_dict_stocks: List of stock dictionaries with s_name, s_ticker, s_isin keys
+                          (all three must be present). Only stocks without a ticker will be looked up.
         s_start_date: Start date string in dd-mmm-yy format.
         s_end_date: End date string in dd-mmm-yy format.
 
@@ -593,20 +1093,25 @@ def resolve_tickers_batch_with_prices(
     Raises:
         ApiError: If API is unreachable or returns an error.
     """
-    list_dict_results: List[Dict[str, Any]] = []  # Results for all stocks
+    list_dict_results: List[Optional[Dict[str, Any]]] = [None] * len(list_dict_stocks)  # Results for all stocks (None until resolved)
     list_n_isin_indices: List[int] = []  # Indices of stocks with ISINs (can be batched)
     list_dict_isin_stocks: List[Dict[str, str]] = []  # Stocks with ISINs
     list_n_name_indices: List[int] = []  # Indices of stocks with only names (cannot be batched)
     list_dict_name_stocks: List[Dict[str, str]] = []  # Stocks with only names
 
-    # Categorize stocks
+    # Bind list appends once for the categorisation loop
+    append_isin_index: Callable[[int], None] = list_n_isin_indices.append  # Bound append for ISIN indices
+    append_isin_stock: Callable[[Dict[str, str]], None] = list_dict_isin_stocks.append  # Bound append for ISIN stocks
+    append_name_index: Callable[[int], None] = list_n_name_indices.append  # Bound append for name indices
+    append_name_stock: Callable[[Dict[str, str]], None] = list_dict_name_stocks.append  # Bound append for name stocks
+
+    # Categorize stocks (input parsing always sets s_name, s_ticker and s_isin)
     for n_index, dict_stock in enumerate(list_dict_stocks):
-        s_ticker: str = dict_stock.get("s_ticker", "")  # Existing ticker
-        s_isin: str = dict_stock.get("s_isin", "")  # Stock ISIN
+        s_ticker: str = dict_stock["s_ticker"]  # Existing ticker
 
         if s_ticker:
-            # Stock already has ticker, skip lookup (prices will be fetched later in process_stock)
-            list_dict_results.append({
+            # Stock already has ticker, skip lookup (priced later by process_stock)
+            list_dict_results[n_index] = {
                 "s_ticker": s_ticker,
                 "s_exchange_code": "",
                 "s_full_ticker": "",
@@ -615,17 +1120,19 @@ def resolve_tickers_batch_with_prices(
                 "n_start_price": None,
                 "n_end_price": None,
                 "s_currency": None
-            })
-        elif s_isin:
-            # Stock has ISIN, can be batched via Mapping API
-            list_dict_results.append(None)  # Placeholder
-            list_n_isin_indices.append(n_index)
-            list_dict_isin_stocks.append(dict_stock)
+            }
+        elif dict_stock["s_isin"]:
+            if validate_isin(dict_stock["s_isin"]):
+                # Stock has ISIN, can be batched via Mapping API
+                append_isin_index(n_index)
+                append_isin_stock(dict_stock)
+            else:
+                # Malformed ISIN cannot match, so it is not sent to the Mapping API
+                list_dict_results[n_index] = dict(DICT_NOT_FOUND_RESULT)
         else:
             # Stock has only name, use Search API (no batching)
-            list_dict_results.append(None)  # Placeholder
-            list_n_name_indices.append(n_index)
-            list_dict_name_stocks.append(dict_stock)
+            append_name_index(n_index)
+            append_name_stock(dict_stock)
 
     n_isin_count: int = len(list_dict_isin_stocks)  # Number of ISIN lookups
     n_name_count: int = len(list_dict_name_stocks)  # Number of name lookups
@@ -640,138 +1147,122 @@ def resolve_tickers_batch_with_prices(
     if n_isin_count > 0:
         n_isin_batch_count: int = math.ceil(n_isin_count / OPENFIGI_BATCH_SIZE)  # Number of ISIN batches
 
+        # Build query for each batch
+        list_list_dict_api_queries: List[List[Dict[str, str]]] = []  # Query payloads for OpenFIGI API, one per batch
+
         for n_batch_index in range(n_isin_batch_count):
             n_start_index: int = n_batch_index * OPENFIGI_BATCH_SIZE  # Start index for this batch
             n_end_index: int = min(n_start_index + OPENFIGI_BATCH_SIZE, n_isin_count)  # End index for this batch
 
-            # Build query for this batch
-            list_dict_api_query: List[Dict[str, str]] = []  # Query payload for OpenFIGI API
-
-            for n_stock_index in range(n_start_index, n_end_index):
-                dict_stock: Dict[str, str] = list_dict_isin_stocks[n_stock_index]  # Current stock
-                s_isin: str = dict_stock.get("s_isin", "")  # Stock ISIN
-                dict_query: Dict[str, str] = {"idType": "ID_ISIN", "idValue": s_isin}
-                list_dict_api_query.append(dict_query)
-
-            # Make API request
-            dict_headers: Dict[str, str] = {"Content-Type": "application/json"}  # HTTP request headers
+            list_dict_api_query: List[Dict[str, str]] = [
+                {"idType": "ID_ISIN", "idValue": dict_stock["s_isin"]}
+                for dict_stock in list_dict_isin_stocks[n_start_index:n_end_index]
+            ]  # Query payload for this batch
+            list_list_dict_api_queries.append(list_dict_api_query)
 
-            try:
-                response_api = requests.post(OPENFIGI_MAPPING_URL, json=list_dict_api_query, headers=dict_headers, timeout=30)
-            except Exception as e:
-                raise ApiError(f"OpenFIGI API unreachable. Error: {str(e)}")
-
-            if response_api.status_code == 429:
-                # Extract rate limit headers for debugging
-                s_rate_limit: str = response_api.headers.get("ratelimit-limit", "unknown")  # Max requests allowed
-                s_rate_remaining: str = response_api.headers.get("ratelimit-remaining", "unknown")  # Requests remaining
-                s_rate_reset: str = response_api.headers.get("ratelimit-reset", "unknown")  # Seconds until reset
-                s_error_message: str = (
-                    f"OpenFIGI Mapping API rate limit exceeded.\n"
-                    f"  Endpoint: {OPENFIGI_MAPPING_URL}\n"
-                    f"  Rate Limit: {s_rate_limit} requests\n"
-                    f"  Remaining: {s_rate_remaining}\n"
-                    f"  Reset in: {s_rate_reset} seconds\n"
-                    f"Please wait and try again."
-                )
-                raise ApiError(s_error_message)
+        # Issue batches concurrently; the rate limiter keeps them within 25 req/min
+        n_worker_count: int = min(OPENFIGI_MAPPING_MAX_WORKERS, n_isin_batch_count)  # Concurrent requests
+        with ThreadPoolExecutor(max_workers=n_worker_count) as executor:
+            list_list_dict_responses: List[List[Dict[str, Any]]] = list(
+                executor.map(post_openfigi_mapping_batch, list_list_dict_api_queries)
+            )  # API responses, in batch order
 
-            if response_api.status_code != 200:
-                raise ApiError(f"OpenFIGI API returned error status: {response_api.status_code}")
+        list_tuple_mapped: List[Tuple[int, str, str, str]] = []  # (original index, ticker, exchange code, full ticker) per match
 
-            list_dict_response: List[Dict[str, Any]] = response_api.json()  # API response data
+        for n_batch_index, list_dict_response in enumerate(list_list_dict_responses):
+            n_start_index: int = n_batch_index * OPENFIGI_BATCH_SIZE  # Start index for this batch
+            n_end_index: int = min(n_start_index + OPENFIGI_BATCH_SIZE, n_isin_count)  # End index for this batch
 
-            # Parse response and update results
+            # Parse response and record matches (validated together below)
             for n_response_index, dict_response in enumerate(list_dict_response):
                 n_original_index: int = list_n_isin_indices[n_start_index + n_response_index]  # Original index in input list
 
                 # Check for no match or error
                 if "warning" in dict_response or "error" in dict_response or "data" not in dict_response or len(dict_response.get("data", [])) == 0:
-                    list_dict_results[n_original_index] = {
-                        "s_ticker": "",
-                        "s_exchange_code": "",
-                        "s_full_ticker": "",
-                        "b_not_found": True,
-                        "b_skipped": False,
-                        "n_start_price": None,
-                        "n_end_price": None,
-                        "s_currency": None
-                    }
+                    list_dict_results[n_original_index] = dict(DICT_NOT_FOUND_RESULT)
                 else:
                     dict_first_result: Dict[str, Any] = dict_response["data"][0]  # First matching result
                     s_ticker_raw: str = dict_first_result.get("ticker", "")  # Raw ticker symbol from API
                     s_ticker: str = sanitise_ticker(s_ticker_raw)  # Sanitised ticker symbol
                     s_exchange_code: str = dict_first_result.get("exchCode", "")  # Exchange code
-                    s_exchange_suffix: str = map_exchange_to_suffix(s_exchange_code)  # Exchange suffix for yfinance
+                    s_exchange_suffix: str = DICT_EXCHANGE_SUFFIX.get(s_exchange_code, "")  # Exchange suffix for yfinance
                     s_full_ticker: str = s_ticker + s_exchange_suffix  # Full ticker with suffix
 
-                    # Validate ticker with yfinance and get cached prices
-                    dict_validation: Dict[str, Any] = validate_ticker_and_fetch_prices(
-                        s_full_ticker,
-                        s_start_date,
-                        s_end_date
-                    )
-
-                    if dict_validation.get("b_valid", False):
-                        list_dict_results[n_original_index] = {
-                            "s_ticker": s_ticker,
-                            "s_exchange_code": s_exchange_code,
-                            "s_full_ticker": s_full_ticker,
-                            "b_not_found": False,
-                            "b_skipped": False,
-                            "n_start_price": dict_validation.get("n_start_price"),
-                            "n_end_price": dict_validation.get("n_end_price"),
-                            "s_currency": dict_validation.get("s_currency")
-                        }
-                    else:
-                        # Ticker not valid in yfinance, mark as not found
-                        list_dict_results[n_original_index] = {
-                            "s_ticker": "",
-                            "s_exchange_code": "",
-                            "s_full_ticker": "",
-                            "b_not_found": True,
-                            "b_skipped": False,
-                            "n_start_price": None,
-                            "n_end_price": None,
-                            "s_currency": None
-                        }
+                    list_tuple_mapped.append((n_original_index, s_ticker, s_exchange_code, s_full_ticker))
 
             print(f"  ISIN batch {n_batch_index + 1}/{n_isin_batch_count} complete ({n_end_index - n_start_index} stocks)")
 
-            # Add delay between batches (Mapping API: 25 req/min)
-            if n_batch_index < n_isin_batch_count - 1 or n_name_count > 0:
-                time.sleep(OPENFIGI_MAPPING_DELAY_SECONDS)
-
-    # Process name lookups using Search API (one at a time)
+        # Validate every mapped ticker concurrently; each request returns prices and currency together
+        list_dict_validations: List[Dict[str, Any]] = []  # Validation results, in mapped order
+        if list_tuple_mapped:
+            with ThreadPoolExecutor(max_workers=min(PROCESS_STOCK_MAX_WORKERS, len(list_tuple_mapped))) as executor:
+                list_dict_validations = list(executor.map(
+                    lambda s_full_ticker: validate_ticker_and_fetch_prices(s_full_ticker, s_start_date, s_end_date),
+                    [tuple_mapped[3] for tuple_mapped in list_tuple_mapped]
+                ))
+
+        for (n_original_index, s_ticker, s_exchange_code, s_full_ticker), dict_validation in zip(list_tuple_mapped, list_dict_validations):
+            if dict_validation.get("b_valid", False):
+                list_dict_results[n_original_index] = {
+                    "s_ticker": s_ticker,
+                    "s_exchange_code": s_exchange_code,
+                    "s_full_ticker": s_full_ticker,
+                    "b_not_found": False,
+                    "b_skipped": False,
+                    "n_start_price": dict_validation.get("n_start_price"),
+                    "n_end_price": dict_validation.get("n_end_price"),
+                    "s_currency": dict_validation.get("s_currency")
+                }
+            else:
+                # Ticker not valid in yfinance, mark as not found
+                list_dict_results[n_original_index] = dict(DICT_NOT_FOUND_RESULT)
+
+    # Process name lookups using Search API (requests paced by OPENFIGI_SEARCH_RATE_LIMITER)
     if n_name_count > 0:
         # Calculate estimated time for user feedback
-        n_estimated_minutes: int = (n_name_count * int(OPENFIGI_SEARCH_DELAY_SECONDS)) // 60  # Estimated minutes
+        n_window_count: int = math.ceil(n_name_count / OPENFIGI_SEARCH_RATE_LIMIT)  # Rate limit windows needed
+        n_estimated_minutes: int = int((n_window_count - 1) * OPENFIGI_SEARCH_RATE_PERIOD_SECONDS) // 60  # Estimated minutes
         print(f"  Note: Name lookups are rate-limited to 5/min. Estimated time: ~{n_estimated_minutes} minutes")
 
-        for n_name_index, dict_stock in enumerate(list_dict_name_stocks):
-            s_name: str = dict_stock.get("s_name", "")  # Stock name
-            n_original_index: int = list_n_name_indices[n_name_index]  # Original index in input list
-
-            dict_lookup_result: Dict[str, Any] = resolve_ticker_with_prices(s_name, s_start_date, s_end_date)
-
-            list_dict_results[n_original_index] = {
-                "s_ticker": dict_lookup_result.get("s_ticker", ""),
-                "s_exchange_code": dict_lookup_result.get("s_exchange_code", ""),
-                "s_full_ticker": dict_lookup_result.get("s_full_ticker", ""),
-                "b_not_found": dict_lookup_result.get("b_not_found", True),
-                "b_skipped": False,
-                "n_start_price": dict_lookup_result.get("n_start_price"),
-                "n_end_price": dict_lookup_result.get("n_end_price"),
-                "s_currency": dict_lookup_result.get("s_currency")
-            }
-
-            # Progress update every 5 stocks (more frequent due to longer delays)
-            if (n_name_index + 1) % 5 == 0 or n_name_index == n_name_count - 1:
-                print(f"  Name lookup {n_name_index + 1}/{n_name_count} complete")
-
-            # Add delay between requests (Search API: 5 req/min)
-            if n_name_index < n_name_count - 1:
-                time.sleep(OPENFIGI_SEARCH_DELAY_SECONDS)
+        # Run lookups concurrently; the limiter lets up to 5 Search requests out per window and
+        # each stock's yfinance validation overlaps the wait for the next window
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=min(OPENFIGI_SEARCH_MAX_WORKERS, n_name_count))  # Pool for name lookups
+        b_wait_for_workers: bool = True  # False once an error should be reported without joining the workers
+        try:
+            list_future_lookups: List[Any] = [
+                executor.submit(resolve_ticker_with_prices, dict_stock.get("s_name", ""), s_start_date, s_end_date)
+                for dict_stock in list_dict_name_stocks
+            ]  # Pending lookups, in input order
+
+            for n_name_index, future_lookup in enumerate(list_future_lookups):
+                n_original_index: int = list_n_name_indices[n_name_index]  # Original index in input list
+
+                try:
+                    dict_lookup_result: Dict[str, Any] = future_lookup.result()
+                except ApiError:
+                    # Stop queued lookups and skip joining workers already waiting on the rate limiter,
+                    # so the error is reported at once (the interpreter still joins them before exiting)
+                    for future_pending in list_future_lookups:
+                        future_pending.cancel()
+                    b_wait_for_workers = False
+                    raise
+
+                list_dict_results[n_original_index] = {
+                    "s_ticker": dict_lookup_result.get("s_ticker", ""),
+                    "s_exchange_code": dict_lookup_result.get("s_exchange_code", ""),
+                    "s_full_ticker": dict_lookup_result.get("s_full_ticker", ""),
+                    "b_not_found": dict_lookup_result.get("b_not_found", True),
+                    "b_skipped": False,
+                    "n_start_price": dict_lookup_result.get("n_start_price"),
+                    "n_end_price": dict_lookup_result.get("n_end_price"),
+                    "s_currency": dict_lookup_result.get("s_currency")
+                }
+
+                # Progress update every 5 stocks (more frequent due to longer delays)
+                if (n_name_index + 1) % 5 == 0 or n_name_index == n_name_count - 1:
+                    print(f"  Name lookup {n_name_index + 1}/{n_name_count} complete")
+        finally:
+            executor.shutdown(wait=b_wait_for_workers)
 
     return list_dict_results
 
@@ -786,7 +1277,8 @@ def resolve_all_tickers(
 
     This function looks up tickers for stocks that don't have one provided,
     validates them against yfinance, applies exchange suffixes, and caches
-    price data to avoid duplicate API calls.
+    price data to avoid duplicate API calls. User-provided tickers are left
+    for process_stock, which prices them and reads their currency in one request.
 
     Args:
         list_dict_stocks: List of stock dictionaries with s_name, s_ticker, s_isin keys.
@@ -809,7 +1301,7 @@ def resolve_all_tickers(
     # Update stock dictionaries with lookup results
     for n_index, dict_lookup_result in enumerate(list_dict_lookup_results):
         if dict_lookup_result.get("b_skipped", False):
-            # Stock already had ticker, no changes needed (prices will be fetched later)
+            # Stock already had ticker, no changes needed
             continue
 
         if dict_lookup_result.get("b_not_found", False):
@@ -831,24 +1323,28 @@ def resolve_all_tickers(
     return list_dict_stocks
 
 
-# Exchange Suffix Mapping Functions
+# Date Adjustment Functions
 
-def map_exchange_to_suffix(s_exchange_code: str) -> str:
+@functools.lru_cache(maxsize=256)
+def parse_date(s_date: str) -> datetime:
     """
-    Map exchange code to yfinance ticker suffix.
+    Parse a date string in dd-mmm-yy format.
+
+    Results are memoised because the same few dates are parsed for every stock,
+    and datetime.strptime is comparatively slow. datetime objects are immutable,
+    so sharing cached instances is safe.
 
     Args:
-        s_exchange_code: Exchange code from OpenFIGI (e.g., "LN", "US").
+        s_date: Date string in dd-mmm-yy format.
 
     Returns:
-        Suffix string for yfinance (e.g., ".L" for London, "" for US).
-    """
-    s_suffix: str = DICT_EXCHANGE_SUFFIX.get(s_exchange_code, "")  # Look up suffix or default to empty
-
-    return s_suffix
+        Parsed datetime object.
 
+    Raises:
+        ValueError: If the string does not match DATE_FORMAT.
+    """
+    return datetime.strptime(s_date, DATE_FORMAT)
 
-# Date Adjustment Functions
 
 def adjust_to_trading_day(s_date: str, b_return_flag: bool = False) -> Union[str, Tuple[str, bool]]:
     """
@@ -866,20 +1362,13 @@ def adjust_to_trading_day(s_date: str, b_return_flag: bool = False) -> Union[str
         If b_return_flag is False: Adjusted date string.
         If b_return_flag is True: Tuple of (adjusted date string, was_adjusted boolean).
     """
-    dt_date: datetime = datetime.strptime(s_date, DATE_FORMAT)  # Parsed datetime object
-    n_weekday: int = dt_date.weekday()  # Day of week (0=Monday, 6=Sunday)
-    b_was_adjusted: bool = False  # Flag indicating if date was changed
-
-    # Saturday (5) -> Monday (add 2 days)
-    if n_weekday == 5:
-        dt_date = dt_date + timedelta(days=2)
-        b_was_adjusted = True
-    # Sunday (6) -> Monday (add 1 day)
-    elif n_weekday == 6:
-        dt_date = dt_date + timedelta(days=1)
-        b_was_adjusted = True
+    n_offset_days: int = TUPLE_N_WEEKEND_OFFSET_DAYS[parse_date(s_date).weekday()]  # Days to next trading day (0 on weekdays)
+    b_was_adjusted: bool = n_offset_days != 0  # Flag indicating if date was changed
 
-    s_adjusted_date: str = dt_date.strftime(DATE_FORMAT)  # Formatted adjusted date
+    # Weekdays are returned as given, skipping the strftime call
+    s_adjusted_date: str = s_date  # Formatted adjusted date
+    if b_was_adjusted:
+        s_adjusted_date = (parse_date(s_date) + timedelta(days=n_offset_days)).strftime(DATE_FORMAT)
 
     if b_return_flag:
         return s_adjusted_date, b_was_adjusted
@@ -893,6 +1382,9 @@ def generate_output_filename(s_output_directory_path: str) -> str:
     """
     Generate output filename with versioning if file already exists.
 
+    The version is one higher than the highest existing version, so a new
+    file never takes a lower number than an earlier run's output.
+
     Args:
         s_output_directory_path: Directory path for output file.
 
@@ -905,21 +1397,91 @@ def generate_output_filename(s_output_directory_path: str) -> str:
     if not os.path.exists(s_output_base_name_path):
         return s_output_base_name_path
 
-    # Find next available version number
-    n_version: int = 1  # Starting version number
+    # Find the highest existing version with one directory read (instead of one stat per version)
+    s_versioned_prefix: str = "stock_changes_output_v"  # Versioned filename prefix
+    n_max_version: int = 0  # Highest existing version number
+
+    with os.scandir(s_output_directory_path) as iterator_entries:
+        # Loop through each directory entry to find versioned output files
+        for entry_file in iterator_entries:
+            if not (entry_file.name.startswith(s_versioned_prefix) and entry_file.name.endswith(".csv")):
+                continue
 
-    while True:
-        s_versioned_name: str = f"stock_changes_output_v{n_version}.csv"  # Versioned filename
-        s_versioned_path: str = os.path.join(s_output_directory_path, s_versioned_name)  # Full versioned path
+            s_version: str = entry_file.name[len(s_versioned_prefix):-len(".csv")]  # Version number text
+            if s_version.isdigit():
+                n_max_version = max(n_max_version, int(s_version))
 
-        if not os.path.exists(s_versioned_path):
-            return s_versioned_path
+    s_versioned_name: str = f"{s_versioned_prefix}{n_max_version + 1}.csv"  # Next versioned filename
 
-        n_version += 1
+    return os.path.join(s_output_directory_path, s_versioned_name)
 
 
 # Stock Data Fetching Functions
 
+DICT_TICKER_CACHE: Dict[str, Any] = {}  # yfinance Ticker objects by symbol, reused across calls
+
+
+def get_ticker(s_ticker: str) -> Any:
+    """
+    Get the yfinance Ticker object for a symbol, creating it on first use.
+
+    Reusing one Ticker per symbol keeps its fetched state (e.g., price
+    history metadata) available to later calls for the same stock. No session
+    is passed: yfinance already routes every Ticker and download through one
+    shared keep-alive session that impersonates a browser, which a plain
+    requests.Session would lose. Creating a Ticker also turns off yfinance's
+    exception hiding, so call_yfinance_with_retry can retry network errors.
+
+    Args:
+        s_ticker: Stock ticker symbol (including exchange suffix if needed).
+
+    Returns:
+        yfinance Ticker object.
+    """
+    ticker_stock: Any = DICT_TICKER_CACHE.get(s_ticker)  # Cached Ticker object if present
+
+    if ticker_stock is None:
+        import yfinance  # Deferred import (see module imports)
+        yfinance.config.debug.hide_exceptions = False  # Raise network errors instead of returning an empty history
+        ticker_stock = yfinance.Ticker(s_ticker)
+        DICT_TICKER_CACHE[s_ticker] = ticker_stock
+
+    return ticker_stock
+
+
+def call_yfinance_with_retry(fn_request: Callable[[], Any]) -> Any:
+    """
+    Call a yfinance request, retrying rate limiting and network errors.
+
+    Waits YFINANCE_RETRY_BACKOFF_SECONDS before the first retry and doubles the
+    wait for each further retry, so a transient Yahoo fault is not mistaken for
+    a ticker without data. get_ticker tells yfinance not to hide exceptions,
+    so network errors are raised here rather than returned as an empty price
+    history.
+
+    Args:
+        fn_request: Function that performs the yfinance request.
+
+    Returns:
+        The request's result.
+
+    Raises:
+        ApiError: If Yahoo Finance still rate limits or is unreachable after YFINANCE_MAX_RETRIES retries.
+    """
+    from yfinance.exceptions import YFRateLimitError  # Deferred import (see module imports)
+
+    # Loop until the request succeeds or the retries are used up
+    for n_attempt in range(YFINANCE_MAX_RETRIES + 1):
+        try:
+            return fn_request()
+        except (YFRateLimitError, OSError) as e:
+            if n_attempt == YFINANCE_MAX_RETRIES:
+                raise ApiError(f"Yahoo Finance unavailable after {YFINANCE_MAX_RETRIES} retries. Error: {str(e)}")
+
+            time.sleep(YFINANCE_RETRY_BACKOFF_SECONDS * (2 ** n_attempt))
+
+
+@disk_cached("yfinance", get_price_cache_ttl_seconds, lambda dict_result: dict_result.get("b_valid", False))
 def validate_ticker_and_fetch_prices(s_ticker: str, s_start_date: str, s_end_date: str) -> Dict[str, Any]:
     """
     Validate a ticker exists in yfinance by attempting to fetch price data.
@@ -939,6 +1501,9 @@ def validate_ticker_and_fetch_prices(s_ticker: str, s_start_date: str, s_end_dat
             - n_start_price: Start closing price (if valid)
             - n_end_price: End closing price (if valid)
             - s_currency: Currency code (if valid)
+
+    Raises:
+        ApiError: If Yahoo Finance is rate limiting or unreachable after retries.
     """
     try:
         # Adjust dates to trading days (skip weekends)
@@ -946,36 +1511,32 @@ def validate_ticker_and_fetch_prices(s_ticker: str, s_start_date: str, s_end_dat
         s_adjusted_end_date: str = adjust_to_trading_day(s_end_date)  # Adjusted end date
 
         # Parse dates for yfinance
-        dt_start: datetime = datetime.strptime(s_adjusted_start_date, DATE_FORMAT)  # Parsed start date
-        dt_start_end: datetime = dt_start + timedelta(days=5)  # End of start date range (covers holidays)
-        dt_end: datetime = datetime.strptime(s_adjusted_end_date, DATE_FORMAT)  # Parsed end date
-        dt_end_end: datetime = dt_end + timedelta(days=5)  # End of end date range (covers holidays)
+        dt_start: datetime = parse_date(s_adjusted_start_date)  # Parsed start date
+        dt_end: datetime = parse_date(s_adjusted_end_date)  # Parsed end date
+        dt_range_begin: datetime = min(dt_start, dt_end)  # Begin of history range (dates may be given in either order)
+        dt_range_end: datetime = max(dt_start, dt_end) + timedelta(days=5)  # End of history range (covers holidays)
 
-        s_yf_start_begin: str = dt_start.strftime("%Y-%m-%d")  # yfinance format for start date begin
-        s_yf_start_end: str = dt_start_end.strftime("%Y-%m-%d")  # yfinance format for start date end
-        s_yf_end_begin: str = dt_end.strftime("%Y-%m-%d")  # yfinance format for end date begin
-        s_yf_end_end: str = dt_end_end.strftime("%Y-%m-%d")  # yfinance format for end date end
+        # No price data can exist for a window that has not started yet
+        if max(dt_start, dt_end) > datetime.now():
+            return {"b_valid": False}
 
         # Create yfinance ticker object
-        ticker_stock = yfinance.Ticker(s_ticker)  # yfinance Ticker object
+        ticker_stock = get_ticker(s_ticker)  # yfinance Ticker object
 
-        # Fetch start price
-        df_start_history = ticker_stock.history(start=s_yf_start_begin, end=s_yf_start_end)  # Start date price history
-        if df_start_history.empty:
+        # Fetch both windows with one chart request (unadjusted closes only, no dividend/split processing)
+        df_history = call_yfinance_with_retry(
+            lambda: ticker_stock.history(start=dt_range_begin, end=dt_range_end, auto_adjust=False, actions=False)
+        )  # Price history covering both windows
+        if df_history.empty:
             return {"b_valid": False}
 
-        n_start_price: float = df_start_history["Close"].iloc[0]  # First available closing price for start
-
-        # Fetch end price
-        df_end_history = ticker_stock.history(start=s_yf_end_begin, end=s_yf_end_end)  # End date price history
-        if df_end_history.empty:
+        n_start_price: Optional[float] = extract_window_close_price(df_history["Close"], dt_start)  # First available closing price for start
+        n_end_price: Optional[float] = extract_window_close_price(df_history["Close"], dt_end)  # First available closing price for end
+        if n_start_price is None or n_end_price is None:
             return {"b_valid": False}
 
-        n_end_price: float = df_end_history["Close"].iloc[0]  # First available closing price for end
-
-        # Fetch currency
-        dict_info: Dict[str, Any] = ticker_stock.info  # Stock info dictionary
-        s_currency: str = dict_info.get("currency", "N/A")  # Currency code
+        # Currency comes with the chart response metadata (no separate quote summary request)
+        s_currency: str = ticker_stock.get_history_metadata().get("currency", "N/A")  # Currency code
 
         return {
             "b_valid": True,
@@ -984,61 +1545,229 @@ def validate_ticker_and_fetch_prices(s_ticker: str, s_start_date: str, s_end_dat
             "s_currency": s_currency
         }
 
+    except ApiError:
+        # Yahoo Finance unavailable: not a verdict on the ticker, so let the caller report it
+        raise
+
     except Exception:
-        # Any error means ticker is invalid or has no data
+        # Any other error means ticker is invalid or has no data
         return {"b_valid": False}
 
 
-def fetch_stock_price(s_ticker: str, s_date: str) -> float:
+def extract_window_close_price(series_close: Any, dt_window_start: datetime) -> Optional[float]:
     """
-    Fetch closing stock price for a given date using yfinance library.
+    Extract the first closing price within a 5-day window from a price series.
 
-    This function fetches a 5-day range starting from the requested date to handle
-    cases where the exact date is a public holiday. The yfinance library (Yahoo Finance)
-    automatically handles holidays by only returning data for actual trading days.
-    We take the first available closing price from the returned data.
+    The 5-day window mirrors the single-ticker fetches, covering public holidays
+    that fall on the requested date.
 
     Args:
-        s_ticker: Stock ticker symbol (including exchange suffix if needed).
-        s_date: Date string in dd-mmm-yy format.
+        series_close: pandas Series of closing prices indexed by date.
+        dt_window_start: First date of the window.
 
     Returns:
-        Closing price as float.
+        First available closing price in the window, or None if there is none.
+    """
+    index_dates = series_close.index  # Trading dates of the series
+    if getattr(index_dates, "tz", None) is not None:
+        index_dates = index_dates.tz_localize(None)  # Compare against naive datetimes
+
+    dt_window_end: datetime = dt_window_start + timedelta(days=5)  # End of window (covers holidays)
+    series_window = series_close[(index_dates >= dt_window_start) & (index_dates < dt_window_end)].dropna()  # Closes inside window
+
+    if series_window.empty:
+        return None
+
+    return float(series_window.iloc[0])
+
+
+def download_prices_batch(list_s_batch: List[str], s_yf_range_begin: str, s_yf_range_end: str) -> Any:
+    """
+    Download price history for one batch of tickers, raising if Yahoo Finance is unavailable.
+
+    yfinance.download records rate limits and network errors per ticker and
+    returns no data for them, so a batch with no prices at all cannot be told
+    apart from a batch of unknown tickers. In that case the first ticker is
+    requested on its own, which raises the underlying error for
+    call_yfinance_with_retry to retry.
+
+    Args:
+        list_s_batch: Ticker symbols in the batch (including exchange suffix if needed).
+        s_yf_range_begin: Range begin in yfinance format (YYYY-MM-DD).
+        s_yf_range_end: Range end in yfinance format (YYYY-MM-DD).
+
+    Returns:
+        pandas DataFrame of price history for the batch.
 
     Raises:
-        StockDelistedError: If no price data is available (stock may be delisted).
+        YFRateLimitError: If Yahoo Finance is rate limiting.
+        OSError: If Yahoo Finance is unreachable.
     """
-    dt_date: datetime = datetime.strptime(s_date, DATE_FORMAT)  # Parsed date
-    dt_end_date: datetime = dt_date + timedelta(days=5)  # End date for price range query (covers holidays)
+    import yfinance  # Deferred import (see module imports)
+    from yfinance.exceptions import YFRateLimitError  # Deferred import (see module imports)
+
+    df_history = yfinance.download(
+        tickers=" ".join(list_s_batch),
+        start=s_yf_range_begin,
+        end=s_yf_range_end,
+        group_by="ticker",
+        auto_adjust=False,
+        actions=False,
+        threads=True,
+        progress=False
+    )  # Price history for all tickers in batch
+
+    if df_history.empty or df_history.isna().all().all():
+        try:
+            get_ticker(list_s_batch[0]).history(start=s_yf_range_begin, end=s_yf_range_end, auto_adjust=False, actions=False)
+        except (YFRateLimitError, OSError):
+            raise
+        except Exception:
+            pass  # Ticker has no data, so the empty batch is genuine
 
-    s_yfinance_start_date: str = dt_date.strftime("%Y-%m-%d")  # Start date in yfinance format (YYYY-MM-DD)
-    s_yfinance_end_date: str = dt_end_date.strftime("%Y-%m-%d")  # End date in yfinance format (YYYY-MM-DD)
+    return df_history
 
-    ticker_stock = yfinance.Ticker(s_ticker)  # yfinance Ticker object for the stock
-    df_history = ticker_stock.history(start=s_yfinance_start_date, end=s_yfinance_end_date)  # Price history dataframe from Yahoo Finance
 
-    if df_history.empty:
-        raise StockDelistedError(f"Stock {s_ticker} appears to be delisted. No price data available.")
+def fetch_prices_batch(list_s_tickers: List[str], s_start_date: str, s_end_date: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch start and end closing prices for multiple tickers with batched yfinance downloads.
 
-    n_close_price: float = df_history["Close"].iloc[0]  # First available closing price
+    A single yfinance.download call covering the whole date range replaces one
+    Ticker().history() pair per ticker. Tickers are downloaded in batches of
+    YFINANCE_BATCH_SIZE to stay within Yahoo's per-request limits. Valid
+    results are stored per ticker in FILE_CACHE (when enabled), so later runs
+    only download tickers they have not seen.
 
-    return n_close_price
+    Args:
+        list_s_tickers: Ticker symbols (including exchange suffix if needed).
+        s_start_date: Start date string in dd-mmm-yy format.
+        s_end_date: End date string in dd-mmm-yy format.
 
+    Returns:
+        Dictionary keyed by ticker, each value containing:
+            - b_valid: True if both prices are available, False otherwise
+            - n_start_price: Start closing price (if valid)
+            - n_end_price: End closing price (if valid)
 
+    Raises:
+        ApiError: If Yahoo Finance is rate limiting or unreachable after retries.
+    """
+    dict_dict_prices: Dict[str, Dict[str, Any]] = {}  # Prices keyed by ticker
+    list_s_unique_tickers: List[str] = list(dict.fromkeys(list_s_tickers))  # De-duplicated tickers, order preserved
+
+    if not list_s_unique_tickers:
+        return dict_dict_prices
+
+    # Adjust dates to trading days (skip weekends)
+    dt_start: datetime = parse_date(adjust_to_trading_day(s_start_date))  # Adjusted start date
+    dt_end: datetime = parse_date(adjust_to_trading_day(s_end_date))  # Adjusted end date
+    dt_range_begin: datetime = min(dt_start, dt_end)  # Begin of download range (dates may be given in either order)
+    dt_range_end: datetime = max(dt_start, dt_end) + timedelta(days=5)  # End of download range (covers holidays)
+
+    # No price data can exist for a window that has not started yet
+    if max(dt_start, dt_end) > datetime.now():
+        return {s_ticker: {"b_valid": False} for s_ticker in list_s_unique_tickers}
+
+    s_yf_range_begin: str = dt_range_begin.strftime("%Y-%m-%d")  # yfinance format for range begin
+    s_yf_range_end: str = dt_range_end.strftime("%Y-%m-%d")  # yfinance format for range end
+
+    # Serve tickers already downloaded on a previous run from the on-disk cache
+    list_s_download_tickers: List[str] = []  # Tickers that still need downloading
+
+    for s_ticker in list_s_unique_tickers:
+        dict_cached: Optional[Dict[str, Any]] = None  # Cached prices if present
+
+        if FILE_CACHE is not None:
+            dict_cached = FILE_CACHE.get("yfinance", json.dumps(["fetch_prices_batch", s_ticker, s_start_date, s_end_date]))
+
+        if dict_cached is not None:
+            dict_dict_prices[s_ticker] = dict_cached
+        else:
+            list_s_download_tickers.append(s_ticker)
+
+    # Loop through tickers in batches
+    for n_start_index in range(0, len(list_s_download_tickers), YFINANCE_BATCH_SIZE):
+        list_s_batch: List[str] = list_s_download_tickers[n_start_index:n_start_index + YFINANCE_BATCH_SIZE]  # Tickers in this batch
+
+        try:
+            df_history = call_yfinance_with_retry(
+                lambda: download_prices_batch(list_s_batch, s_yf_range_begin, s_yf_range_end)
+            )  # Price history for all tickers in batch
+        except ApiError:
+            # Yahoo Finance unavailable: not a verdict on the tickers, so let the caller report it
+            raise
+        except Exception:
+            df_history = None  # Treat a failed download as no data for the whole batch
+
+        # Extract prices for each ticker in batch
+        for s_ticker in list_s_batch:
+            dict_dict_prices[s_ticker] = {"b_valid": False}
+
+            if df_history is None or df_history.empty:
+                continue
+
+            try:
+                if df_history.columns.nlevels > 1:
+                    series_close = df_history[s_ticker]["Close"]  # Closing prices for ticker (multi-ticker layout)
+                else:
+                    series_close = df_history["Close"]  # Closing prices for ticker (single-ticker layout)
+            except KeyError:
+                continue
+
+            n_start_price: Optional[float] = extract_window_close_price(series_close, dt_start)  # Start closing price
+            n_end_price: Optional[float] = extract_window_close_price(series_close, dt_end)  # End closing price
+
+            if n_start_price is None or n_end_price is None:
+                continue
+
+            dict_dict_prices[s_ticker] = {
+                "b_valid": True,
+                "n_start_price": round(n_start_price, 2),
+                "n_end_price": round(n_end_price, 2)
+            }
+
+            if FILE_CACHE is not None:
+                FILE_CACHE.set(
+                    "yfinance",
+                    json.dumps(["fetch_prices_batch", s_ticker, s_start_date, s_end_date]),
+                    dict_dict_prices[s_ticker],
+                    get_price_cache_ttl_seconds(s_ticker, s_start_date, s_end_date)
+                )
+
+    return dict_dict_prices
+
+
+@disk_cached("yfinance", get_identifier_cache_ttl_seconds, lambda s_currency: s_currency != "N/A")
 def fetch_stock_currency(s_ticker: str) -> str:
     """
     Fetch currency for a stock using yfinance library.
 
+    The currency is read from chart metadata. Unless this ticker's Ticker
+    object has already fetched price history, this costs one short chart
+    request of its own; tickers priced by fetch_prices_batch always need it,
+    as yfinance.download does not keep the metadata.
+
     Args:
         s_ticker: Stock ticker symbol.
 
     Returns:
-        Three-letter currency code (e.g., "USD", "GBP").
+        Three-letter currency code (e.g., "USD", "GBP"), or "N/A" if unavailable.
+
+    Raises:
+        ApiError: If Yahoo Finance is rate limiting or unreachable after retries.
     """
-    ticker_stock = yfinance.Ticker(s_ticker)  # yfinance Ticker object for the stock
-    dict_info: Dict[str, Any] = ticker_stock.info  # Stock info dictionary from Yahoo Finance
+    ticker_stock = get_ticker(s_ticker)  # yfinance Ticker object for the stock
 
-    s_currency: str = dict_info.get("currency", "N/A")  # Currency code
+    try:
+        dict_metadata: Any = call_yfinance_with_retry(ticker_stock.get_history_metadata)  # Chart metadata (requested if not already held)
+    except ApiError:
+        # Yahoo Finance unavailable: let the caller report it
+        raise
+    except Exception:
+        # Any other error means no metadata is available for the ticker
+        return "N/A"
+
+    s_currency: str = dict_metadata.get("currency", "N/A")  # Currency code
 
     return s_currency
 
@@ -1088,9 +1817,8 @@ def write_output_csv(s_output_file_path: str, s_start_date: str, s_end_date: str
         writer_csv.writerow(["Start Date", s_start_date, "End Date", s_end_date])
         writer_csv.writerow([])  # Blank row
 
-        # Write date adjustment notes if any. Loop through each date adjustment note
-        for s_date_adjustment_note in list_s_date_adjustment_notes:
-            writer_csv.writerow([s_date_adjustment_note])
+        # Write date adjustment notes if any (one note per row)
+        writer_csv.writerows([s_date_adjustment_note] for s_date_adjustment_note in list_s_date_adjustment_notes)
 
         if list_s_date_adjustment_notes:
             writer_csv.writerow([])  # Blank row after notes
@@ -1098,10 +1826,8 @@ def write_output_csv(s_output_file_path: str, s_start_date: str, s_end_date: str
         # Write column headers
         writer_csv.writerow(["Stock Name", "Ticker", "ISIN", "Start Price", "End Price", "Percentage", "Currency"])
 
-        # Write stock data rows. Loop through each stock result
-        for dict_result in list_dict_results:
-            list_row: List[str] = format_output_row(dict_result)  # Formatted row
-            writer_csv.writerow(list_row)
+        # Write stock data rows (one formatted row per stock result)
+        writer_csv.writerows(format_output_row(dict_result) for dict_result in list_dict_results)
 
 
 def print_output_terminal(s_start_date: str, s_end_date: str, list_dict_results: List[Dict[str, Any]], list_s_date_adjustment_notes: List[str]) -> None:
@@ -1124,13 +1850,14 @@ def print_output_terminal(s_start_date: str, s_end_date: str, list_dict_results:
     if list_s_date_adjustment_notes:
         print()
 
-    # Print column headers
-    print("Stock Name,Ticker,ISIN,Start Price,End Price,Percentage,Currency")
+    # Format column headers and stock data rows as CSV (quotes names containing commas)
+    buffer_output = io.StringIO()  # In-memory buffer for the results table
+    writer_csv = csv.writer(buffer_output, lineterminator="\n")
+    writer_csv.writerow(["Stock Name", "Ticker", "ISIN", "Start Price", "End Price", "Percentage", "Currency"])
+    writer_csv.writerows(format_output_row(dict_result) for dict_result in list_dict_results)
 
-    # Print stock data rows. Loop through each stock result
-    for dict_result in list_dict_results:
-        list_row: List[str] = format_output_row(dict_result)  # Formatted row
-        print(",".join(list_row))
+    # Print the whole table with a single write
+    sys.stdout.write(buffer_output.getvalue())
 
 
 # Main Processing Functions
@@ -1141,7 +1868,7 @@ def process_stock(dict_stock: Dict[str, Any], s_start_date: str, s_end_date: str
 
     Expects ticker to be pre-resolved via resolve_all_tickers() before calling this function.
     If prices were cached during ticker resolution, they will be used directly.
-    Otherwise, prices will be fetched from yfinance.
+    Otherwise, prices and currency will be fetched from yfinance in one request.
 
     Args:
         dict_stock: Stock dictionary with name, ticker, isin, optional cached prices, and optional b_not_found flag.
@@ -1187,7 +1914,7 @@ def process_stock(dict_stock: Dict[str, Any], s_start_date: str, s_end_date: str
 
         return dict_result, list_s_date_adjustment_notes
 
-    # No cached prices - fetch from yfinance (for user-provided tickers)
+    # No cached prices - user-provided ticker
     # Adjust dates to trading days
     s_adjusted_start_date: str
     b_start_adjusted: bool
@@ -1203,19 +1930,19 @@ def process_stock(dict_stock: Dict[str, Any], s_start_date: str, s_end_date: str
     if b_end_adjusted:
         list_s_date_adjustment_notes.append(f"End date adjusted to {s_adjusted_end_date} (next trading day) for: {s_name}")
 
-    # Fetch stock prices
-    try:
-        n_start_price_fetched: float = fetch_stock_price(s_ticker, s_adjusted_start_date)
-        n_end_price_fetched: float = fetch_stock_price(s_ticker, s_adjusted_end_date)
-    except StockDelistedError:
+    # Fetch both prices and the currency with one history request
+    dict_validation: Dict[str, Any] = validate_ticker_and_fetch_prices(s_ticker, s_start_date, s_end_date)  # Prices and currency
+    if not dict_validation.get("b_valid", False):
         dict_result["s_error"] = "Delisted"
         return dict_result, list_s_date_adjustment_notes
 
+    n_start_price_fetched: float = dict_validation["n_start_price"]  # Start closing price
+    n_end_price_fetched: float = dict_validation["n_end_price"]  # End closing price
+
     # Calculate percentage change
     n_percentage_calc: float = calculate_percentage_change(n_start_price_fetched, n_end_price_fetched)
 
-    # Fetch currency
-    s_currency_fetched: str = fetch_stock_currency(s_ticker)
+    s_currency_fetched: str = dict_validation.get("s_currency", "N/A")  # Currency code
 
     # Update result
     dict_result["n_start_price"] = round(n_start_price_fetched, 2)
@@ -1228,6 +1955,8 @@ def process_stock(dict_stock: Dict[str, Any], s_start_date: str, s_end_date: str
 
 def main() -> None:
     """Main entry point for the stock calculator."""
+    global FILE_CACHE
+
     list_s_args: List[str] = sys.argv[1:]  # Command line arguments
 
     try:
@@ -1241,10 +1970,15 @@ def main() -> None:
     s_start_date_arg: Optional[str] = dict_args.get("s_start_date")  # Start date from CLI
     s_end_date_arg: Optional[str] = dict_args.get("s_end_date")  # End date from CLI
     s_output_directory_path: Optional[str] = dict_args.get("s_output_directory_path")  # Output directory
+    b_no_cache: bool = dict_args.get("b_no_cache", False)  # True to disable the on-disk cache
 
     # Set default output directory to script location
     if not s_output_directory_path:
-        s_output_directory_path = os.path.dirname(os.path.abspath(__file__))
+        s_output_directory_path = SCRIPT_DIRECTORY_PATH
+
+    # Enable on-disk cache for OpenFIGI and yfinance lookups
+    if not b_no_cache:
+        FILE_CACHE = FileCache(os.path.join(SCRIPT_DIRECTORY_PATH, CACHE_DIRECTORY_NAME))
 
     list_dict_stocks: List[Dict[str, str]] = []  # List of stocks to process
     s_start_date: str = ""  # Start date for calculations
@@ -1288,12 +2022,18 @@ def main() -> None:
 
     print("Fetching stock prices...")
 
-    # Loop through each stock to process
-    for dict_stock in list_dict_stocks:
-        dict_result: Dict[str, Any]
-        list_s_date_adjustment_notes: List[str]
-        dict_result, list_s_date_adjustment_notes = process_stock(dict_stock, s_start_date, s_end_date)
+    # Process stocks concurrently (I/O bound); map yields results in input order
+    try:
+        with ThreadPoolExecutor(max_workers=PROCESS_STOCK_MAX_WORKERS) as executor:
+            list_tuple_processed: List[Tuple[Dict[str, Any], List[str]]] = list(
+                executor.map(lambda dict_stock: process_stock(dict_stock, s_start_date, s_end_date), list_dict_stocks)
+            )  # (result, date adjustment notes) per stock
+    except ApiError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
 
+    # Loop through each processed stock to collect results and notes
+    for dict_result, list_s_date_adjustment_notes in list_tuple_processed:
         list_dict_results.append(dict_result)
         list_s_all_date_adjustment_notes.extend(list_s_date_adjustment_notes)
 
@@ -11,238 +11,207 @@ TEST CATEGORIES
     4. Date Adjustment
     5. Output File Versioning
     6. CLI Argument Parsing
+    7. Stock Data Fetching
+    8. Exchange Priority Result Selection
+    9. File Cache
+    10. Batch Ticker Resolution
+    11. Main Processing
 """
 
 import pytest
+import json
 import os
-import tempfile
 from datetime import datetime
+from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from typing import Dict, List, Any
+from types import MappingProxyType, SimpleNamespace
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 
 
-# CSV Parsing Tests
+# Test Helpers
 
-class TestCsvParsing:
-    """Tests for CSV file parsing functionality."""
+def make_openfigi_response(payload: Any, n_status_code: int = 200, dict_headers: Optional[Dict[str, str]] = None) -> SimpleNamespace:
+    """Build a lightweight stand-in for an OpenFIGI requests.Response (status, JSON body and headers)."""
+    return SimpleNamespace(status_code=n_status_code, content=json.dumps(payload).encode(), headers=dict_headers or {})
 
-    def test_parse_valid_csv_with_correct_structure(self) -> None:
-        """Test parsing a valid CSV file with correct structure."""
-        # Arrange
-        s_csv_content: str = """Start Date,01-Oct-25,End Date,01-Jan-26
-,,,
-Stocks,,,
-Name,Ticker,ISIN,
-Apple Inc,AAPL,,
-Microsoft Corp,MSFT,US5949181045,
-"""
-        # Act & Assert
-        # Should return parsed data with dates and stock list
-        from src.stock_calculator import parse_csv_file
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as file_temp:
-            file_temp.write(s_csv_content)
-            s_temp_path: str = file_temp.name  # Path to temporary test file
+def make_isin(s_isin_body: str) -> str:
+    """Complete an 11-character ISIN body with the check digit that makes it valid."""
+    from src.stock_calculator import validate_isin
 
-        try:
-            dict_result: Dict[str, Any] = parse_csv_file(s_temp_path)
-
-            assert dict_result['s_start_date'] == '01-Oct-25'
-            assert dict_result['s_end_date'] == '01-Jan-26'
-            assert len(dict_result['list_dict_stocks']) == 2
-            assert dict_result['list_dict_stocks'][0]['s_name'] == 'Apple Inc'
-            assert dict_result['list_dict_stocks'][0]['s_ticker'] == 'AAPL'
-            assert dict_result['list_dict_stocks'][1]['s_isin'] == 'US5949181045'
-        finally:
-            os.unlink(s_temp_path)
+    return next(s_isin_body + s_check_digit for s_check_digit in '0123456789' if validate_isin(s_isin_body + s_check_digit))
 
-    def test_parse_csv_missing_dates_row_raises_exception(self) -> None:
-        """Test that missing dates row raises a clear exception."""
-        # Arrange
-        s_csv_content: str = """Stocks,,,
-Name,Ticker,ISIN,
-Apple Inc,AAPL,,
-"""
-        from src.stock_calculator import parse_csv_file, CsvParsingError
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as file_temp:
-            file_temp.write(s_csv_content)
-            s_temp_path: str = file_temp.name  # Path to temporary test file
+def fetch_prices_all_valid(list_s_tickers: List[str], s_start_date: str, s_end_date: str) -> Dict[str, Dict[str, Any]]:
+    """Stand-in for fetch_prices_batch that reports every ticker as valid with fixed prices."""
+    return {s_ticker: {'b_valid': True, 'n_start_price': 100.0, 'n_end_price': 110.0} for s_ticker in list_s_tickers}
 
-        try:
-            # Act & Assert
-            with pytest.raises(CsvParsingError) as exc_info:
-                parse_csv_file(s_temp_path)
 
-            assert 'date' in str(exc_info.value).lower()
-        finally:
-            os.unlink(s_temp_path)
+# CSV Parsing Tests
 
-    def test_parse_csv_invalid_date_format_raises_exception(self) -> None:
-        """Test that invalid date format raises a clear exception."""
-        # Arrange
-        s_csv_content: str = """Start Date,2025-10-01,End Date,2026-01-01
+# CSV parsing inputs by case name (written to disk once per module by dict_csv_paths)
+DICT_S_CSV_CONTENTS: Dict[str, str] = {
+    'valid': """Start Date,01-Oct-25,End Date,01-Jan-26
 ,,,
 Stocks,,,
 Name,Ticker,ISIN,
 Apple Inc,AAPL,,
-"""
-        from src.stock_calculator import parse_csv_file, CsvParsingError
-
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as file_temp:
-            file_temp.write(s_csv_content)
-            s_temp_path: str = file_temp.name  # Path to temporary test file
-
-        try:
-            # Act & Assert
-            with pytest.raises(CsvParsingError) as exc_info:
-                parse_csv_file(s_temp_path)
-
-            assert 'date format' in str(exc_info.value).lower()
-        finally:
-            os.unlink(s_temp_path)
-
-    def test_parse_csv_empty_stock_list_raises_exception(self) -> None:
-        """Test that empty stock list raises a clear exception."""
-        # Arrange
-        s_csv_content: str = """Start Date,01-Oct-25,End Date,01-Jan-26
+Microsoft Corp,MSFT,US5949181045,
+""",
+    'missing_dates': """Stocks,,,
+Name,Ticker,ISIN,
+Apple Inc,AAPL,,
+""",
+    'invalid_date': """Start Date,2025-10-01,End Date,2026-01-01
 ,,,
 Stocks,,,
 Name,Ticker,ISIN,
+Apple Inc,AAPL,,
+""",
+    'empty_stocks': """Start Date,01-Oct-25,End Date,01-Jan-26
 ,,,
-"""
-        from src.stock_calculator import parse_csv_file, CsvParsingError
-
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as file_temp:
-            file_temp.write(s_csv_content)
-            s_temp_path: str = file_temp.name  # Path to temporary test file
-
-        try:
-            # Act & Assert
-            with pytest.raises(CsvParsingError) as exc_info:
-                parse_csv_file(s_temp_path)
-
-            assert 'empty' in str(exc_info.value).lower() or 'no stocks' in str(exc_info.value).lower()
-        finally:
-            os.unlink(s_temp_path)
-
-    def test_parse_csv_with_only_stock_names(self) -> None:
-        """Test parsing CSV where only stock names are provided (no ticker/ISIN)."""
-        # Arrange
-        s_csv_content: str = """Start Date,01-Oct-25,End Date,01-Jan-26
+Stocks,,,
+Name,Ticker,ISIN,
+,,,
+""",
+    'names_only': """Start Date,01-Oct-25,End Date,01-Jan-26
 ,,,
 Stocks,,,
 Name,Ticker,ISIN,
 National Grid PLC,,,
 Shell PLC,,,
+""",
+    'ragged_rows': """Start Date,01-Oct-25,End Date,01-Jan-26
+,,,
+Stocks,,,
+Name,Ticker,ISIN,
+Apple Inc
+
+Microsoft Corp,MSFT,US5949181045,extra,fields
+ Shell PLC , SHEL.L ,
 """
-        from src.stock_calculator import parse_csv_file
+}
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as file_temp:
-            file_temp.write(s_csv_content)
-            s_temp_path: str = file_temp.name  # Path to temporary test file
 
-        try:
-            # Act
-            dict_result: Dict[str, Any] = parse_csv_file(s_temp_path)
+@pytest.fixture(scope="module")
+def dict_csv_paths(tmp_path_factory: pytest.TempPathFactory) -> Dict[str, str]:
+    """Write each CSV parsing input once per module and return the file paths by case name."""
+    s_csv_directory_path: str = str(tmp_path_factory.mktemp('csv'))  # Directory shared by the CSV parsing tests
+    dict_s_paths: Dict[str, str] = {}  # File path by case name
 
-            # Assert
-            assert len(dict_result['list_dict_stocks']) == 2
-            assert dict_result['list_dict_stocks'][0]['s_name'] == 'National Grid PLC'
-            assert dict_result['list_dict_stocks'][0]['s_ticker'] == ''
-            assert dict_result['list_dict_stocks'][0]['s_isin'] == ''
-        finally:
-            os.unlink(s_temp_path)
+    for s_case_name, s_csv_content in DICT_S_CSV_CONTENTS.items():
+        dict_s_paths[s_case_name] = os.path.join(s_csv_directory_path, f'{s_case_name}.csv')
+        with open(dict_s_paths[s_case_name], 'w', encoding='utf-8') as file_csv:
+            file_csv.write(s_csv_content)
 
+    return dict_s_paths
 
-# Percentage Calculation Tests
 
-class TestPercentageCalculation:
-    """Tests for percentage change calculation."""
+class TestCsvParsing:
+    """Tests for CSV file parsing functionality."""
 
-    def test_calculate_positive_percentage_change(self) -> None:
-        """Test calculation when stock price increased."""
-        from src.stock_calculator import calculate_percentage_change
+    def test_parse_valid_csv_with_correct_structure(self, dict_csv_paths: Dict[str, str]) -> None:
+        """Test parsing a valid CSV file with correct structure."""
+        # Act & Assert
+        # Should return parsed data with dates and stock list
+        from src.stock_calculator import parse_csv_file
 
-        # Arrange
-        n_start_price: float = 100.0  # Starting price
-        n_end_price: float = 150.0  # Ending price (50% increase)
+        dict_result: Dict[str, Any] = parse_csv_file(dict_csv_paths['valid'])
 
-        # Act
-        n_result: float = calculate_percentage_change(n_start_price, n_end_price)
+        assert dict_result['s_start_date'] == '01-Oct-25'
+        assert dict_result['s_end_date'] == '01-Jan-26'
+        assert len(dict_result['list_dict_stocks']) == 2
+        assert dict_result['list_dict_stocks'][0]['s_name'] == 'Apple Inc'
+        assert dict_result['list_dict_stocks'][0]['s_ticker'] == 'AAPL'
+        assert dict_result['list_dict_stocks'][1]['s_isin'] == 'US5949181045'
 
-        # Assert
-        assert n_result == 50.0
+    def test_parse_csv_missing_dates_row_raises_exception(self, dict_csv_paths: Dict[str, str]) -> None:
+        """Test that missing dates row raises a clear exception."""
+        from src.stock_calculator import parse_csv_file, CsvParsingError
 
-    def test_calculate_negative_percentage_change(self) -> None:
-        """Test calculation when stock price decreased."""
-        from src.stock_calculator import calculate_percentage_change
+        # Act & Assert
+        with pytest.raises(CsvParsingError, match=r'(?i)date'):
+            parse_csv_file(dict_csv_paths['missing_dates'])
 
-        # Arrange
-        n_start_price: float = 100.0  # Starting price
-        n_end_price: float = 75.0  # Ending price (25% decrease)
+    def test_parse_csv_invalid_date_format_raises_exception(self, dict_csv_paths: Dict[str, str]) -> None:
+        """Test that invalid date format raises a clear exception."""
+        from src.stock_calculator import parse_csv_file, CsvParsingError
 
-        # Act
-        n_result: float = calculate_percentage_change(n_start_price, n_end_price)
+        # Act & Assert
+        with pytest.raises(CsvParsingError, match=r'(?i)date format'):
+            parse_csv_file(dict_csv_paths['invalid_date'])
 
-        # Assert
-        assert n_result == -25.0
+    def test_parse_csv_empty_stock_list_raises_exception(self, dict_csv_paths: Dict[str, str]) -> None:
+        """Test that empty stock list raises a clear exception."""
+        from src.stock_calculator import parse_csv_file, CsvParsingError
 
-    def test_calculate_zero_percentage_change(self) -> None:
-        """Test calculation when stock price unchanged."""
-        from src.stock_calculator import calculate_percentage_change
+        # Act & Assert
+        with pytest.raises(CsvParsingError, match=r'(?i)empty|no stocks'):
+            parse_csv_file(dict_csv_paths['empty_stocks'])
 
-        # Arrange
-        n_start_price: float = 100.0  # Starting price
-        n_end_price: float = 100.0  # Ending price (no change)
+    def test_parse_csv_with_only_stock_names(self, dict_csv_paths: Dict[str, str]) -> None:
+        """Test parsing CSV where only stock names are provided (no ticker/ISIN)."""
+        from src.stock_calculator import parse_csv_file
 
         # Act
-        n_result: float = calculate_percentage_change(n_start_price, n_end_price)
+        dict_result: Dict[str, Any] = parse_csv_file(dict_csv_paths['names_only'])
 
         # Assert
-        assert n_result == 0.0
-
-    def test_calculate_percentage_with_decimal_precision(self) -> None:
-        """Test calculation returns appropriate decimal precision."""
-        from src.stock_calculator import calculate_percentage_change
+        assert len(dict_result['list_dict_stocks']) == 2
+        assert dict_result['list_dict_stocks'][0]['s_name'] == 'National Grid PLC'
+        assert dict_result['list_dict_stocks'][0]['s_ticker'] == ''
+        assert dict_result['list_dict_stocks'][0]['s_isin'] == ''
 
-        # Arrange
-        n_start_price: float = 100.0  # Starting price
-        n_end_price: float = 116.78  # Ending price
+    def test_parse_csv_tolerates_ragged_rows(self, dict_csv_paths: Dict[str, str]) -> None:
+        """Test that stock rows with missing or extra fields and blank lines are handled."""
+        from src.stock_calculator import parse_csv_file
 
         # Act
-        n_result: float = calculate_percentage_change(n_start_price, n_end_price)
+        dict_result: Dict[str, Any] = parse_csv_file(dict_csv_paths['ragged_rows'])
 
         # Assert
-        assert round(n_result, 2) == 16.78
+        assert dict_result['list_dict_stocks'] == [
+            {'s_name': 'Apple Inc', 's_ticker': '', 's_isin': ''},
+            {'s_name': 'Microsoft Corp', 's_ticker': 'MSFT', 's_isin': 'US5949181045'},
+            {'s_name': 'Shell PLC', 's_ticker': 'SHEL.L', 's_isin': ''}
+        ]
 
-    def test_calculate_percentage_with_small_numbers(self) -> None:
-        """Test calculation with small stock prices (penny stocks)."""
-        from src.stock_calculator import calculate_percentage_change
 
-        # Arrange
-        n_start_price: float = 0.05  # Starting price (5 cents)
-        n_end_price: float = 0.10  # Ending price (10 cents, 100% increase)
+# Percentage Calculation Tests
+
+class TestPercentageCalculation:
+    """Tests for percentage change calculation."""
+
+    @pytest.mark.parametrize('n_start_price, n_end_price, n_expected', [
+        pytest.param(100.0, 150.0, 50.0, id='positive'),
+        pytest.param(100.0, 75.0, -25.0, id='negative'),
+        pytest.param(100.0, 100.0, 0.0, id='zero'),
+        pytest.param(0.05, 0.10, 100.0, id='small_numbers'),  # Penny stock (5 cents to 10 cents)
+        pytest.param(500000.0, 550000.0, 10.0, id='large_numbers')  # Berkshire Hathaway style
+    ])
+    def test_calculate_percentage_change(self, n_start_price: float, n_end_price: float, n_expected: float) -> None:
+        """Test calculation for rising, falling, unchanged, small and large prices."""
+        from src.stock_calculator import calculate_percentage_change
 
         # Act
         n_result: float = calculate_percentage_change(n_start_price, n_end_price)
 
         # Assert
-        assert n_result == 100.0
+        assert n_result == n_expected
 
-    def test_calculate_percentage_with_large_numbers(self) -> None:
-        """Test calculation with large stock prices."""
+    def test_calculate_percentage_with_decimal_precision(self) -> None:
+        """Test calculation returns appropriate decimal precision."""
         from src.stock_calculator import calculate_percentage_change
 
         # Arrange
-        n_start_price: float = 500000.0  # Starting price (Berkshire Hathaway style)
-        n_end_price: float = 550000.0  # Ending price (10% increase)
+        n_start_price: float = 100.0  # Starting price
+        n_end_price: float = 116.78  # Ending price
 
         # Act
         n_result: float = calculate_percentage_change(n_start_price, n_end_price)
 
         # Assert
-        assert n_result == 10.0
+        assert round(n_result, 2) == 16.78
 
 
 # OpenFIGI Lookup Tests
@@ -250,7 +219,7 @@ class TestPercentageCalculation:
 class TestOpenFigiLookup:
     """Tests for OpenFIGI API ticker resolution."""
 
-    @patch('src.stock_calculator.requests.post')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
     def test_lookup_ticker_by_name_success(self, mock_post: Mock) -> None:
         """Test successful ticker lookup using company name via Search API."""
         from src.stock_calculator import lookup_ticker_from_openfigi
@@ -258,10 +227,8 @@ class TestOpenFigiLookup:
         # Arrange
         s_company_name: str = 'Apple Inc'  # Company name to search
 
-        mock_response: Mock = Mock()
-        mock_response.status_code = 200
         # Search API returns a dict with 'data' key directly (not a list)
-        mock_response.json.return_value = {
+        mock_post.return_value = make_openfigi_response({
             'data': [
                 {
                     'ticker': 'AAPL',
@@ -269,8 +236,7 @@ class TestOpenFigiLookup:
                     'name': 'APPLE INC'
                 }
             ]
-        }
-        mock_post.return_value = mock_response
+        })
 
         # Act
         dict_result: Dict[str, str] = lookup_ticker_from_openfigi(s_stock_name=s_company_name)
@@ -278,7 +244,7 @@ class TestOpenFigiLookup:
         # Assert
         assert dict_result['s_ticker'] == 'AAPL'
 
-    @patch('src.stock_calculator.requests.post')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
     def test_lookup_ticker_by_isin_success(self, mock_post: Mock) -> None:
         """Test successful ticker lookup using ISIN."""
         from src.stock_calculator import lookup_ticker_from_openfigi
@@ -286,9 +252,7 @@ class TestOpenFigiLookup:
         # Arrange
         s_isin: str = 'US0378331005'  # Apple ISIN
 
-        mock_response: Mock = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
+        mock_post.return_value = make_openfigi_response([
             {
                 'data': [
                     {
@@ -298,8 +262,7 @@ class TestOpenFigiLookup:
                     }
                 ]
             }
-        ]
-        mock_post.return_value = mock_response
+        ])
 
         # Act
         dict_result: Dict[str, str] = lookup_ticker_from_openfigi(s_isin=s_isin)
@@ -307,7 +270,7 @@ class TestOpenFigiLookup:
         # Assert
         assert dict_result['s_ticker'] == 'AAPL'
 
-    @patch('src.stock_calculator.requests.post')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
     def test_lookup_ticker_not_found(self, mock_post: Mock) -> None:
         """Test handling when stock is not found in OpenFIGI."""
         from src.stock_calculator import lookup_ticker_from_openfigi
@@ -315,14 +278,11 @@ class TestOpenFigiLookup:
         # Arrange
         s_company_name: str = 'Nonexistent Company XYZ'  # Invalid company name
 
-        mock_response: Mock = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
+        mock_post.return_value = make_openfigi_response([
             {
                 'warning': 'No match found'
             }
-        ]
-        mock_post.return_value = mock_response
+        ])
 
         # Act
         dict_result: Dict[str, str] = lookup_ticker_from_openfigi(s_stock_name=s_company_name)
@@ -331,7 +291,7 @@ class TestOpenFigiLookup:
         assert dict_result['s_ticker'] == ''
         assert dict_result['b_not_found'] == True
 
-    @patch('src.stock_calculator.requests.post')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
     def test_lookup_ticker_api_error(self, mock_post: Mock) -> None:
         """Test handling when OpenFIGI API returns an error."""
         from src.stock_calculator import lookup_ticker_from_openfigi, ApiError
@@ -342,12 +302,10 @@ class TestOpenFigiLookup:
         mock_post.side_effect = Exception('Connection refused')
 
         # Act & Assert
-        with pytest.raises(ApiError) as exc_info:
+        with pytest.raises(ApiError, match=r'(?i)api|unreachable'):
             lookup_ticker_from_openfigi(s_stock_name=s_company_name)
 
-        assert 'api' in str(exc_info.value).lower() or 'unreachable' in str(exc_info.value).lower()
-
-    @patch('src.stock_calculator.requests.post')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
     def test_lookup_returns_exchange_code_for_suffix(self, mock_post: Mock) -> None:
         """Test that lookup returns exchange code for yfinance suffix mapping."""
         from src.stock_calculator import lookup_ticker_from_openfigi
@@ -355,10 +313,8 @@ class TestOpenFigiLookup:
         # Arrange
         s_company_name: str = 'National Grid PLC'  # UK listed company
 
-        mock_response: Mock = Mock()
-        mock_response.status_code = 200
         # Search API returns dict with 'data' key (not list like Mapping API)
-        mock_response.json.return_value = {
+        mock_post.return_value = make_openfigi_response({
             'data': [
                 {
                     'ticker': 'NG',
@@ -366,8 +322,7 @@ class TestOpenFigiLookup:
                     'name': 'NATIONAL GRID PLC'
                 }
             ]
-        }
-        mock_post.return_value = mock_response
+        })
 
         # Act
         dict_result: Dict[str, str] = lookup_ticker_from_openfigi(s_stock_name=s_company_name)
@@ -376,109 +331,126 @@ class TestOpenFigiLookup:
         assert dict_result['s_ticker'] == 'NG'
         assert dict_result['s_exchange_code'] == 'LN'
 
+    def test_openfigi_session_retries_gateway_errors(self) -> None:
+        """Test that the shared OpenFIGI session sends JSON and retries transient POST failures."""
+        from src.stock_calculator import create_openfigi_session
 
-# Exchange Suffix Mapping Tests
+        # Act
+        session_openfigi = create_openfigi_session()
+        retry_policy = session_openfigi.get_adapter('https://api.openfigi.com/v3/mapping').max_retries
 
-class TestExchangeSuffixMapping:
-    """Tests for mapping exchange codes to yfinance ticker suffixes."""
+        # Assert
+        assert session_openfigi.headers['Content-Type'] == 'application/json'
+        assert retry_policy.total == 3
+        assert 'POST' in retry_policy.allowed_methods
+        assert set(retry_policy.status_forcelist) == {502, 503, 504}
 
-    def test_map_us_exchange_no_suffix(self) -> None:
-        """Test that US exchanges (NYSE, NASDAQ) have no suffix."""
-        from src.stock_calculator import map_exchange_to_suffix
+    def test_parse_json_response_without_orjson(self) -> None:
+        """Test that OpenFIGI responses are parsed with the standard library when orjson is unavailable."""
+        import src.stock_calculator as stock_calculator
 
-        # Act & Assert
-        assert map_exchange_to_suffix('US') == ''
-        assert map_exchange_to_suffix('UN') == ''
-        assert map_exchange_to_suffix('UQ') == ''
+        # Arrange
+        response_api = make_openfigi_response([{'data': [{'ticker': 'AAPL', 'exchCode': 'US'}]}])  # Response stand-in
 
-    def test_map_london_exchange_suffix(self) -> None:
-        """Test that London Stock Exchange maps to .L suffix."""
-        from src.stock_calculator import map_exchange_to_suffix
+        # Act
+        with patch.object(stock_calculator, 'orjson', None):
+            list_dict_response: List[Dict[str, Any]] = stock_calculator.parse_json_response(response_api)
 
-        # Act & Assert
-        assert map_exchange_to_suffix('LN') == '.L'
+        # Assert
+        assert list_dict_response == [{'data': [{'ticker': 'AAPL', 'exchCode': 'US'}]}]
 
-    def test_map_unknown_exchange_returns_empty(self) -> None:
-        """Test that unknown exchange codes return empty suffix."""
-        from src.stock_calculator import map_exchange_to_suffix
 
-        # Act & Assert
-        assert map_exchange_to_suffix('UNKNOWN') == ''
+# Exchange Suffix Mapping Tests
 
+class TestExchangeSuffixMapping:
+    """Tests for mapping exchange codes to yfinance ticker suffixes."""
 
-# Date Adjustment Tests
+    @pytest.mark.parametrize('s_exchange_code, s_expected_suffix', [
+        pytest.param('US', '', id='us_composite'),
+        pytest.param('UN', '', id='nyse'),
+        pytest.param('UQ', '', id='nasdaq'),
+        pytest.param('LN', '.L', id='london'),
+        pytest.param('UNKNOWN', '', id='unknown')
+    ])
+    def test_exchange_suffix_lookup(self, s_exchange_code: str, s_expected_suffix: str) -> None:
+        """Test that US exchanges and unknown codes have no suffix and London maps to .L."""
+        from src.stock_calculator import DICT_EXCHANGE_SUFFIX
 
-class TestDateAdjustment:
-    """Tests for adjusting dates to valid trading days."""
+        # Act & Assert
+        assert DICT_EXCHANGE_SUFFIX.get(s_exchange_code, '') == s_expected_suffix
 
-    def test_adjust_weekend_saturday_to_monday(self) -> None:
-        """Test that Saturday is adjusted to the following Monday."""
-        from src.stock_calculator import adjust_to_trading_day
 
-        # Arrange
-        s_date: str = '04-Jan-25'  # Saturday
+# ISIN Validation Tests
 
-        # Act
-        s_adjusted: str = adjust_to_trading_day(s_date)
+class TestIsinValidation:
+    """Tests for checking ISIN shape and check digit before OpenFIGI lookups."""
 
-        # Assert
-        assert s_adjusted == '06-Jan-25'  # Monday
+    @pytest.mark.parametrize('s_isin, b_expected_valid', [
+        pytest.param('US0378331005', True, id='us_digits'),
+        pytest.param('GB00BDR05C01', True, id='gb_alphanumeric'),
+        pytest.param('us0378331005', True, id='lower_case'),
+        pytest.param('US0378331006', False, id='wrong_check_digit'),
+        pytest.param('US037833100', False, id='too_short'),
+        pytest.param('0S0378331005', False, id='numeric_country_code'),
+        pytest.param('US03783310-5', False, id='punctuation')
+    ])
+    def test_validate_isin(self, s_isin: str, b_expected_valid: bool) -> None:
+        """Test that well-formed ISINs pass and malformed ones or bad check digits fail."""
+        from src.stock_calculator import validate_isin
 
-    def test_adjust_weekend_sunday_to_monday(self) -> None:
-        """Test that Sunday is adjusted to the following Monday."""
-        from src.stock_calculator import adjust_to_trading_day
+        # Act & Assert
+        assert validate_isin(s_isin) is b_expected_valid
 
-        # Arrange
-        s_date: str = '05-Jan-25'  # Sunday
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
+    def test_malformed_isin_skips_mapping_api(self, mock_post: Mock) -> None:
+        """Test that a malformed ISIN is reported as not found without an OpenFIGI request."""
+        from src.stock_calculator import lookup_ticker_from_openfigi, resolve_tickers_batch_with_prices
 
         # Act
-        s_adjusted: str = adjust_to_trading_day(s_date)
+        dict_lookup_result: Dict[str, Any] = lookup_ticker_from_openfigi(s_isin='US0378331006')
+        list_dict_results: List[Dict[str, Any]] = resolve_tickers_batch_with_prices(
+            [{'s_name': 'Apple Inc', 's_ticker': '', 's_isin': 'US0378331006'}], '01-Jan-25', '01-Apr-25'
+        )
 
         # Assert
-        assert s_adjusted == '06-Jan-25'  # Monday
-
-    def test_weekday_unchanged(self) -> None:
-        """Test that a weekday remains unchanged."""
-        from src.stock_calculator import adjust_to_trading_day
+        mock_post.assert_not_called()
+        assert dict_lookup_result['b_not_found'] is True
+        assert list_dict_results[0]['b_not_found'] is True
 
-        # Arrange
-        s_date: str = '06-Jan-25'  # Monday
 
-        # Act
-        s_adjusted: str = adjust_to_trading_day(s_date)
+# Date Adjustment Tests
 
-        # Assert
-        assert s_adjusted == '06-Jan-25'  # Same date
+class TestDateAdjustment:
+    """Tests for adjusting dates to valid trading days."""
 
-    def test_returns_adjustment_flag_when_changed(self) -> None:
-        """Test that function indicates when date was adjusted."""
+    @pytest.mark.parametrize('s_date, s_expected_date, b_expected_adjusted', [
+        pytest.param('04-Jan-25', '06-Jan-25', True, id='saturday_to_monday'),
+        pytest.param('05-Jan-25', '06-Jan-25', True, id='sunday_to_monday'),
+        pytest.param('06-Jan-25', '06-Jan-25', False, id='weekday_unchanged')
+    ])
+    def test_adjust_to_trading_day(self, s_date: str, s_expected_date: str, b_expected_adjusted: bool) -> None:
+        """Test that weekends move to the following Monday, with and without the adjustment flag."""
         from src.stock_calculator import adjust_to_trading_day
 
-        # Arrange
-        s_date: str = '04-Jan-25'  # Saturday
-
         # Act
-        s_adjusted: str
-        b_was_adjusted: bool
-        s_adjusted, b_was_adjusted = adjust_to_trading_day(s_date, b_return_flag=True)
+        s_adjusted: str = adjust_to_trading_day(s_date)
+        tuple_flagged: Tuple[str, bool] = adjust_to_trading_day(s_date, b_return_flag=True)
 
         # Assert
-        assert b_was_adjusted == True
-
-    def test_returns_no_adjustment_flag_when_unchanged(self) -> None:
-        """Test that function indicates when date was not adjusted."""
-        from src.stock_calculator import adjust_to_trading_day
+        assert s_adjusted == s_expected_date
+        assert tuple_flagged == (s_expected_date, b_expected_adjusted)
 
-        # Arrange
-        s_date: str = '06-Jan-25'  # Monday
+    def test_parse_date_is_memoised(self) -> None:
+        """Test that repeated parses of the same date string reuse the cached result."""
+        from src.stock_calculator import parse_date
 
         # Act
-        s_adjusted: str
-        b_was_adjusted: bool
-        s_adjusted, b_was_adjusted = adjust_to_trading_day(s_date, b_return_flag=True)
+        dt_first: datetime = parse_date('06-Jan-25')
+        dt_second: datetime = parse_date('06-Jan-25')
 
         # Assert
-        assert b_was_adjusted == False
+        assert dt_first == datetime(2025, 1, 6)
+        assert dt_first is dt_second
 
 
 # Output File Versioning Tests
@@ -486,184 +458,209 @@ class TestDateAdjustment:
 class TestOutputFileVersioning:
     """Tests for output file versioning logic."""
 
-    def test_no_existing_file_uses_default_name(self) -> None:
+    def test_no_existing_file_uses_default_name(self, tmp_path: Path) -> None:
         """Test that default filename is used when no file exists."""
         from src.stock_calculator import generate_output_filename
 
-        # Arrange
-        with tempfile.TemporaryDirectory() as s_temp_dir:
-            # Act
-            s_filename: str = generate_output_filename(s_temp_dir)
+        # Act
+        s_filename: str = generate_output_filename(str(tmp_path))
 
-            # Assert
-            assert s_filename == os.path.join(s_temp_dir, 'stock_changes_output.csv')
+        # Assert
+        assert Path(s_filename) == tmp_path / 'stock_changes_output.csv'
 
-    def test_existing_file_creates_v1(self) -> None:
+    def test_existing_file_creates_v1(self, tmp_path: Path) -> None:
         """Test that v1 suffix is added when default file exists."""
         from src.stock_calculator import generate_output_filename
 
         # Arrange
-        with tempfile.TemporaryDirectory() as s_temp_dir:
-            s_existing_path: str = os.path.join(s_temp_dir, 'stock_changes_output.csv')
-            with open(s_existing_path, 'w') as file_existing:
-                file_existing.write('dummy content')  # Create existing file
+        (tmp_path / 'stock_changes_output.csv').touch()  # Create existing file
 
-            # Act
-            s_filename: str = generate_output_filename(s_temp_dir)
+        # Act
+        s_filename: str = generate_output_filename(str(tmp_path))
 
-            # Assert
-            assert s_filename == os.path.join(s_temp_dir, 'stock_changes_output_v1.csv')
+        # Assert
+        assert Path(s_filename) == tmp_path / 'stock_changes_output_v1.csv'
 
-    def test_existing_v1_creates_v2(self) -> None:
+    def test_existing_v1_creates_v2(self, tmp_path: Path) -> None:
         """Test that v2 suffix is used when v1 already exists."""
         from src.stock_calculator import generate_output_filename
 
         # Arrange
-        with tempfile.TemporaryDirectory() as s_temp_dir:
-            s_default_path: str = os.path.join(s_temp_dir, 'stock_changes_output.csv')
-            s_v1_path: str = os.path.join(s_temp_dir, 'stock_changes_output_v1.csv')
+        (tmp_path / 'stock_changes_output.csv').touch()  # Create default file
+        (tmp_path / 'stock_changes_output_v1.csv').touch()  # Create v1 file
 
-            with open(s_default_path, 'w') as file_default:
-                file_default.write('dummy content')  # Create default file
-            with open(s_v1_path, 'w') as file_v1:
-                file_v1.write('dummy content')  # Create v1 file
-
-            # Act
-            s_filename: str = generate_output_filename(s_temp_dir)
+        # Act
+        s_filename: str = generate_output_filename(str(tmp_path))
 
-            # Assert
-            assert s_filename == os.path.join(s_temp_dir, 'stock_changes_output_v2.csv')
+        # Assert
+        assert Path(s_filename) == tmp_path / 'stock_changes_output_v2.csv'
 
-    def test_increments_version_correctly(self) -> None:
+    def test_increments_version_correctly(self, tmp_path: Path) -> None:
         """Test that version number increments correctly with multiple existing files."""
         from src.stock_calculator import generate_output_filename
 
-        # Arrange
-        with tempfile.TemporaryDirectory() as s_temp_dir:
-            # Create default, v1, v2, v3 files
-            for s_suffix in ['', '_v1', '_v2', '_v3']:
-                s_path: str = os.path.join(s_temp_dir, f'stock_changes_output{s_suffix}.csv')
-                with open(s_path, 'w') as file_versioned:
-                    file_versioned.write('dummy content')
-
-            # Act
-            s_filename: str = generate_output_filename(s_temp_dir)
-
-            # Assert
-            assert s_filename == os.path.join(s_temp_dir, 'stock_changes_output_v4.csv')
+        # Arrange - create default, v1, v2, v3 files
+        for s_suffix in ['', '_v1', '_v2', '_v3']:
+            (tmp_path / f'stock_changes_output{s_suffix}.csv').touch()
 
+        # Act
+        s_filename: str = generate_output_filename(str(tmp_path))
 
-# CLI Argument Parsing Tests
-
-class TestCliArgumentParsing:
-    """Tests for command-line argument parsing."""
+        # Assert
+        assert Path(s_filename) == tmp_path / 'stock_changes_output_v4.csv'
 
-    def test_parse_valid_file_argument(self) -> None:
-        """Test parsing valid --file argument."""
-        from src.stock_calculator import parse_arguments
+    def test_print_output_terminal_layout(self, capsys: pytest.CaptureFixture) -> None:
+        """Test that the terminal output lists notes, then the header and one line per stock."""
+        from src.stock_calculator import print_output_terminal
 
         # Arrange
-        list_s_args: List[str] = ['--file', 'input.csv']  # Command line arguments
+        list_dict_results: List[Dict[str, Any]] = [
+            {'s_name': 'Apple Inc', 's_ticker': 'AAPL', 's_isin': '', 'n_start_price': 100.0, 'n_end_price': 110.0, 'n_percentage': 10.0, 's_currency': 'USD', 's_error': ''},
+            {'s_name': 'First Republic Bank', 's_ticker': 'FRC', 's_isin': '', 's_error': 'Delisted'}
+        ]
 
         # Act
-        dict_args: Dict[str, Any] = parse_arguments(list_s_args)
+        print_output_terminal('06-Jan-25', '01-Apr-25', list_dict_results, [])
 
         # Assert
-        assert dict_args['s_input_file_path'] == 'input.csv'
+        assert capsys.readouterr().out.splitlines() == [
+            'Start Date: 06-Jan-25, End Date: 01-Apr-25',
+            '',
+            'Stock Name,Ticker,ISIN,Start Price,End Price,Percentage,Currency',
+            'Apple Inc,AAPL,,100.0,110.0,10.0,USD',
+            'First Republic Bank,FRC,,Delisted,,,'
+        ]
 
-    def test_parse_valid_stocks_arguments(self) -> None:
-        """Test parsing valid --stocks, --start, --end arguments."""
-        from src.stock_calculator import parse_arguments
+    def test_print_output_terminal_quotes_names_with_commas(self, capsys: pytest.CaptureFixture) -> None:
+        """Test that terminal rows are CSV-quoted like the output file."""
+        from src.stock_calculator import print_output_terminal
 
         # Arrange
-        list_s_args: List[str] = [
-            '--stocks', 'Apple,Microsoft,Shell',
-            '--start', '01-Jan-25',
-            '--end', '01-Apr-25'
+        list_dict_results: List[Dict[str, Any]] = [
+            {'s_name': 'Berkshire Hathaway, Inc.', 's_ticker': 'BRK-B', 's_isin': '', 'n_start_price': 400.0, 'n_end_price': 440.0, 'n_percentage': 10.0, 's_currency': 'USD', 's_error': ''}
         ]
 
         # Act
-        dict_args: Dict[str, Any] = parse_arguments(list_s_args)
+        print_output_terminal('06-Jan-25', '01-Apr-25', list_dict_results, [])
 
         # Assert
-        assert dict_args['s_stocks'] == 'Apple,Microsoft,Shell'
-        assert dict_args['s_start_date'] == '01-Jan-25'
-        assert dict_args['s_end_date'] == '01-Apr-25'
+        assert capsys.readouterr().out.splitlines()[-1] == '"Berkshire Hathaway, Inc.",BRK-B,,400.0,440.0,10.0,USD'
 
-    def test_parse_optional_output_argument(self) -> None:
-        """Test parsing optional --output argument."""
-        from src.stock_calculator import parse_arguments
+    def test_version_follows_highest_existing_version(self, tmp_path: Path) -> None:
+        """Test that a gap in version numbers is not reused and unrelated files are ignored."""
+        from src.stock_calculator import generate_output_filename
 
         # Arrange
-        list_s_args: List[str] = [
-            '--file', 'input.csv',
-            '--output', 'C:/output/folder/'
-        ]
+        for s_name in ['stock_changes_output.csv', 'stock_changes_output_v1.csv', 'stock_changes_output_v3.csv', 'stock_changes_output_vX.csv']:
+            (tmp_path / s_name).touch()
 
         # Act
-        dict_args: Dict[str, Any] = parse_arguments(list_s_args)
+        s_filename: str = generate_output_filename(str(tmp_path))
 
         # Assert
-        assert dict_args['s_output_directory_path'] == 'C:/output/folder/'
+        assert Path(s_filename) == tmp_path / 'stock_changes_output_v4.csv'
 
-    def test_missing_required_arguments_raises_exception(self) -> None:
-        """Test that missing required arguments raises exception."""
-        from src.stock_calculator import parse_arguments, CliArgumentError
+    def test_write_output_csv_layout(self, tmp_path: Path) -> None:
+        """Test that notes and result rows are written after the header in order."""
+        from src.stock_calculator import write_output_csv
 
         # Arrange
-        list_s_args: List[str] = []  # Empty arguments
+        list_dict_results: List[Dict[str, Any]] = [
+            {'s_name': 'Apple Inc', 's_ticker': 'AAPL', 's_isin': '', 'n_start_price': 100.0, 'n_end_price': 110.0, 'n_percentage': 10.0, 's_currency': 'USD', 's_error': ''},
+            {'s_name': 'Unknown Co', 's_ticker': '', 's_isin': '', 's_error': 'Stock details not found'}
+        ]
 
-        # Act & Assert
-        with pytest.raises(CliArgumentError):
-            parse_arguments(list_s_args)
+        s_output_path: str = str(tmp_path / 'output.csv')  # Output file path
 
-    def test_stocks_without_dates_raises_exception(self) -> None:
-        """Test that --stocks without --start and --end raises exception."""
-        from src.stock_calculator import parse_arguments, CliArgumentError
+        # Act
+        write_output_csv(s_output_path, '04-Jan-25', '01-Apr-25', list_dict_results, ['Start date adjusted to 06-Jan-25 (next trading day) for: Apple Inc'])
+        with open(s_output_path, 'r', encoding='utf-8') as file_output:
+            list_s_lines: List[str] = file_output.read().splitlines()
 
-        # Arrange
-        list_s_args: List[str] = ['--stocks', 'Apple,Microsoft']  # Missing dates
+        # Assert
+        assert list_s_lines == [
+            'Start Date,04-Jan-25,End Date,01-Apr-25',
+            '',
+            'Start date adjusted to 06-Jan-25 (next trading day) for: Apple Inc',
+            '',
+            'Stock Name,Ticker,ISIN,Start Price,End Price,Percentage,Currency',
+            'Apple Inc,AAPL,,100.0,110.0,10.0,USD',
+            'Unknown Co,,,Stock details not found,,,'
+        ]
 
-        # Act & Assert
-        with pytest.raises(CliArgumentError) as exc_info:
-            parse_arguments(list_s_args)
 
-        assert 'start' in str(exc_info.value).lower() or 'end' in str(exc_info.value).lower()
+# CLI Argument Parsing Tests
 
-    def test_file_and_stocks_mutually_exclusive(self) -> None:
-        """Test that --file and --stocks cannot be used together."""
-        from src.stock_calculator import parse_arguments, CliArgumentError
+class TestCliArgumentParsing:
+    """Tests for command-line argument parsing."""
 
-        # Arrange
-        list_s_args: List[str] = [
-            '--file', 'input.csv',
-            '--stocks', 'Apple,Microsoft',
-            '--start', '01-Jan-25',
-            '--end', '01-Apr-25'
-        ]
+    @pytest.mark.parametrize('list_s_args, dict_expected', [
+        pytest.param(['--file', 'input.csv'], {'s_input_file_path': 'input.csv'}, id='file'),
+        pytest.param(
+            ['--stocks', 'Apple,Microsoft,Shell', '--start', '01-Jan-25', '--end', '01-Apr-25'],
+            {'s_stocks': 'Apple,Microsoft,Shell', 's_start_date': '01-Jan-25', 's_end_date': '01-Apr-25'},
+            id='stocks_with_dates'
+        ),
+        pytest.param(['--file', 'input.csv', '--output', 'C:/output/folder/'], {'s_output_directory_path': 'C:/output/folder/'}, id='optional_output')
+    ])
+    def test_parse_valid_arguments(self, list_s_args: List[str], dict_expected: Dict[str, Any]) -> None:
+        """Test parsing valid --file, --stocks/--start/--end and optional --output arguments."""
+        from src.stock_calculator import parse_arguments
+
+        # Act
+        dict_args: Dict[str, Any] = parse_arguments(list_s_args)
+
+        # Assert
+        for s_key, expected_value in dict_expected.items():
+            assert dict_args[s_key] == expected_value
+
+    @pytest.mark.parametrize('list_s_args, s_message_pattern', [
+        pytest.param([], r'(?i)missing required', id='missing_required_arguments'),
+        pytest.param(['--stocks', 'Apple,Microsoft'], r'(?i)start|end', id='stocks_without_dates'),
+        pytest.param(
+            ['--file', 'input.csv', '--stocks', 'Apple,Microsoft', '--start', '01-Jan-25', '--end', '01-Apr-25'],
+            r'(?i)mutually exclusive|both',
+            id='file_and_stocks_mutually_exclusive'
+        ),
+        pytest.param(['--stocks', 'Apple', '--start', '2025-01-01', '--end', '01-Apr-25'], r'(?i)date format', id='invalid_date_format')  # Should be dd-mmm-yy
+    ])
+    def test_invalid_arguments_raise_exception(self, list_s_args: List[str], s_message_pattern: str) -> None:
+        """Test that invalid argument combinations raise CliArgumentError with a helpful message."""
+        from src.stock_calculator import parse_arguments, CliArgumentError
 
         # Act & Assert
-        with pytest.raises(CliArgumentError) as exc_info:
+        with pytest.raises(CliArgumentError, match=s_message_pattern):
             parse_arguments(list_s_args)
 
-        assert 'mutually exclusive' in str(exc_info.value).lower() or 'both' in str(exc_info.value).lower()
+    def test_validate_date_format_accepts_only_dd_mmm_yy(self) -> None:
+        """Test the date shape check against valid and malformed dates."""
+        from src.stock_calculator import validate_date_format
 
-    def test_invalid_date_format_in_cli_raises_exception(self) -> None:
-        """Test that invalid date format in CLI raises exception."""
-        from src.stock_calculator import parse_arguments, CliArgumentError
+        # Act & Assert
+        assert validate_date_format('01-Jan-25') is True
+        assert validate_date_format('31-dec-99') is True
+        assert validate_date_format('1-Jan-25') is False
+        assert validate_date_format('01/Jan/25') is False
+        assert validate_date_format('01-J4n-25') is False
+        assert validate_date_format('01-Jan-2025') is False
+        assert validate_date_format('01-Jan-25\n') is False
+        assert validate_date_format('') is False
+        assert validate_date_format('31-Feb-25') is False
+        assert validate_date_format('01-Xyz-25') is False
+
+    def test_no_cache_flag(self) -> None:
+        """Test parsing optional --no-cache flag."""
+        from src.stock_calculator import parse_arguments
 
         # Arrange
-        list_s_args: List[str] = [
-            '--stocks', 'Apple',
-            '--start', '2025-01-01',  # Wrong format (should be dd-mmm-yy)
-            '--end', '01-Apr-25'
-        ]
+        list_s_args: List[str] = ['--file', 'input.csv', '--no-cache']  # Command line arguments
 
-        # Act & Assert
-        with pytest.raises(CliArgumentError) as exc_info:
-            parse_arguments(list_s_args)
+        # Act
+        dict_args: Dict[str, Any] = parse_arguments(list_s_args)
 
-        assert 'date format' in str(exc_info.value).lower()
+        # Assert
+        assert dict_args['b_no_cache'] == True
+        assert parse_arguments(['--file', 'input.csv'])['b_no_cache'] == False
 
 
 # Stock Data Fetching Tests
@@ -671,85 +668,261 @@ class TestCliArgumentParsing:
 class TestStockDataFetching:
     """Tests for fetching stock price data from yfinance."""
 
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
     @patch('src.stock_calculator.yfinance.Ticker')
-    def test_fetch_stock_price_success(self, mock_ticker_class: Mock) -> None:
-        """Test successful stock price fetch."""
-        from src.stock_calculator import fetch_stock_price
+    def test_fetch_stock_currency(self, mock_ticker_class: Mock) -> None:
+        """Test fetching stock currency."""
+        from src.stock_calculator import fetch_stock_currency
 
         # Arrange
         s_ticker: str = 'AAPL'  # Stock ticker symbol
-        s_date: str = '06-Jan-25'  # Date to fetch price for
 
-        mock_ticker: Mock = Mock()
-        mock_history: Mock = Mock()
-        mock_history.empty = False
-        mock_close_series: Mock = Mock()
-        mock_close_series.iloc.__getitem__ = Mock(return_value=150.25)
-        mock_history.__getitem__ = Mock(return_value=mock_close_series)
-        mock_ticker.history.return_value = mock_history
-        mock_ticker_class.return_value = mock_ticker
+        mock_ticker_class.return_value = SimpleNamespace(get_history_metadata=lambda: {'currency': 'USD'})
 
         # Act
-        n_price: float = fetch_stock_price(s_ticker, s_date)
+        s_currency: str = fetch_stock_currency(s_ticker)
 
         # Assert
-        assert n_price == 150.25
+        assert s_currency == 'USD'
 
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
     @patch('src.stock_calculator.yfinance.Ticker')
-    def test_fetch_stock_price_delisted(self, mock_ticker_class: Mock) -> None:
-        """Test handling of delisted stock."""
-        from src.stock_calculator import fetch_stock_price, StockDelistedError
+    def test_get_ticker_reuses_ticker_objects(self, mock_ticker_class: Mock) -> None:
+        """Test that one yfinance Ticker is created per symbol and then reused."""
+        from src.stock_calculator import get_ticker
 
         # Arrange
-        s_ticker: str = 'FRC'  # First Republic Bank (delisted)
-        s_date: str = '06-Jan-25'  # Date to fetch price for
+        mock_ticker_class.side_effect = lambda s_ticker: Mock(ticker=s_ticker)
 
-        mock_ticker: Mock = Mock()
-        mock_history: Mock = Mock()
-        mock_history.empty = True  # No data available
-        mock_ticker.history.return_value = mock_history
-        mock_ticker_class.return_value = mock_ticker
+        # Act
+        ticker_first = get_ticker('AAPL')
+        ticker_second = get_ticker('AAPL')
+        ticker_other = get_ticker('MSFT')
 
-        # Act & Assert
-        with pytest.raises(StockDelistedError):
-            fetch_stock_price(s_ticker, s_date)
+        # Assert
+        assert ticker_first is ticker_second
+        assert ticker_other is not ticker_first
+        assert mock_ticker_class.call_count == 2
 
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
     @patch('src.stock_calculator.yfinance.Ticker')
-    def test_fetch_stock_currency(self, mock_ticker_class: Mock) -> None:
-        """Test fetching stock currency."""
-        from src.stock_calculator import fetch_stock_currency
+    def test_validate_ticker_fetches_unadjusted_closes(self, mock_ticker_class: Mock) -> None:
+        """Test that validation reads both windows and the currency from one unadjusted history request."""
+        from src.stock_calculator import validate_ticker_and_fetch_prices
+        import pandas as pd
 
         # Arrange
-        s_ticker: str = 'AAPL'  # Stock ticker symbol
-
+        index_dates = pd.to_datetime(['2025-01-06', '2025-01-07', '2025-04-01', '2025-04-02'])  # Trading dates
         mock_ticker: Mock = Mock()
-        mock_ticker.info = {'currency': 'USD'}
+        mock_ticker.history.return_value = pd.DataFrame({'Close': [150.25, 151.0, 170.5, 171.0]}, index=index_dates)
+        mock_ticker.get_history_metadata.return_value = {'currency': 'USD'}
         mock_ticker_class.return_value = mock_ticker
 
         # Act
-        s_currency: str = fetch_stock_currency(s_ticker)
+        dict_result: Dict[str, Any] = validate_ticker_and_fetch_prices('AAPL', '06-Jan-25', '01-Apr-25')
 
         # Assert
-        assert s_currency == 'USD'
+        assert dict_result == {'b_valid': True, 'n_start_price': 150.25, 'n_end_price': 170.5, 's_currency': 'USD'}
+        mock_ticker.history.assert_called_once()
+        dict_kwargs: Dict[str, Any] = mock_ticker.history.call_args[1]  # History request options
+        assert dict_kwargs['start'] == datetime(2025, 1, 6)
+        assert dict_kwargs['end'] == datetime(2025, 4, 6)
+        assert dict_kwargs['auto_adjust'] is False
+        assert dict_kwargs['actions'] is False
+
+    @patch('src.stock_calculator.yfinance.Ticker')
+    def test_validate_ticker_skips_request_for_future_window(self, mock_ticker_class: Mock) -> None:
+        """Test that a start date in the future is rejected without contacting yfinance."""
+        from src.stock_calculator import validate_ticker_and_fetch_prices
+
+        # Act
+        dict_result: Dict[str, Any] = validate_ticker_and_fetch_prices('AAPL', '05-Jan-60', '05-Feb-60')
+
+        # Assert
+        assert dict_result == {'b_valid': False}
+        mock_ticker_class.assert_not_called()
+
+    @patch('src.stock_calculator.yfinance.Ticker')
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
+    def test_validate_ticker_handles_reversed_dates(self, mock_ticker_class: Mock) -> None:
+        """Test that an end date before the start date still fetches a history covering both windows."""
+        from datetime import datetime
+        from src.stock_calculator import validate_ticker_and_fetch_prices
+        import pandas as pd
+
+        # Arrange
+        index_dates = pd.to_datetime(['2025-01-06', '2025-04-01'])  # Trading dates
+        mock_ticker: Mock = Mock()
+        mock_ticker.history.return_value = pd.DataFrame({'Close': [150.25, 170.5]}, index=index_dates)
+        mock_ticker.get_history_metadata.return_value = {'currency': 'USD'}
+        mock_ticker_class.return_value = mock_ticker
+
+        # Act
+        dict_result: Dict[str, Any] = validate_ticker_and_fetch_prices('AAPL', '01-Apr-25', '06-Jan-25')
+
+        # Assert
+        assert mock_ticker.history.call_args[1]['start'] == datetime(2025, 1, 6)
+        assert mock_ticker.history.call_args[1]['end'] == datetime(2025, 4, 6)
+        assert dict_result == {'b_valid': True, 'n_start_price': 170.5, 'n_end_price': 150.25, 's_currency': 'USD'}
+
+    @patch('src.stock_calculator.time.sleep')
+    @patch('src.stock_calculator.yfinance.Ticker')
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
+    def test_validate_ticker_retries_rate_limited_history(self, mock_ticker_class: Mock, mock_sleep: Mock) -> None:
+        """Test that a rate-limited history request is retried with backoff instead of marking the ticker invalid."""
+        from src.stock_calculator import validate_ticker_and_fetch_prices
+        from yfinance.exceptions import YFRateLimitError
+        import pandas as pd
+
+        # Arrange
+        index_dates = pd.to_datetime(['2025-01-06', '2025-04-01'])  # Trading dates
+        mock_ticker: Mock = Mock()
+        mock_ticker.history.side_effect = [YFRateLimitError(), pd.DataFrame({'Close': [150.25, 170.5]}, index=index_dates)]
+        mock_ticker.get_history_metadata.return_value = {'currency': 'USD'}
+        mock_ticker_class.return_value = mock_ticker
+
+        # Act
+        dict_result: Dict[str, Any] = validate_ticker_and_fetch_prices('AAPL', '06-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert dict_result['b_valid'] is True
+        assert mock_ticker.history.call_count == 2
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch('src.stock_calculator.time.sleep')
+    @patch('src.stock_calculator.yfinance.Ticker')
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
+    def test_validate_ticker_raises_when_yahoo_unreachable(self, mock_ticker_class: Mock, mock_sleep: Mock) -> None:
+        """Test that persistent network errors raise ApiError rather than reporting the ticker as invalid."""
+        from src.stock_calculator import validate_ticker_and_fetch_prices, ApiError
+
+        # Arrange
+        mock_ticker: Mock = Mock()
+        mock_ticker.history.side_effect = ConnectionError('connection reset')
+        mock_ticker_class.return_value = mock_ticker
+
+        # Act & Assert
+        with pytest.raises(ApiError, match='Yahoo Finance unavailable'):
+            validate_ticker_and_fetch_prices('AAPL', '06-Jan-25', '01-Apr-25')
+        assert mock_ticker.history.call_count == 4
+        assert [call_sleep[0][0] for call_sleep in mock_sleep.call_args_list] == [2.0, 4.0, 8.0]
+
+    @patch('src.stock_calculator.yfinance.download')
+    def test_fetch_prices_batch_extracts_start_and_end_prices(self, mock_download: Mock) -> None:
+        """Test batched price fetch picks the first close on or after each date per ticker."""
+        import pandas as pd
+        from src.stock_calculator import fetch_prices_batch
+
+        # Arrange - AAPL has data for both windows, DEAD has no data
+        index_dates = pd.to_datetime(['2025-01-06', '2025-01-07', '2025-04-01', '2025-04-02'])  # Trading dates
+        df_history = pd.DataFrame(
+            {
+                ('AAPL', 'Close'): [150.254, 151.0, 170.5, 171.0],
+                ('DEAD', 'Close'): [float('nan')] * 4
+            },
+            index=index_dates
+        )  # Multi-ticker download layout
+        mock_download.return_value = df_history
+
+        # Act
+        dict_prices: Dict[str, Dict[str, Any]] = fetch_prices_batch(['AAPL', 'DEAD'], '04-Jan-25', '01-Apr-25')
+
+        # Assert - one download for both tickers, weekend start adjusted to Monday
+        mock_download.assert_called_once()
+        assert dict_prices['AAPL'] == {"b_valid": True, "n_start_price": 150.25, "n_end_price": 170.5}
+        assert dict_prices['DEAD'] == {"b_valid": False}
+
+    @patch('src.stock_calculator.yfinance.download')
+    def test_fetch_prices_batch_handles_reversed_dates(self, mock_download: Mock) -> None:
+        """Test that an end date before the start date still downloads a range covering both windows."""
+        import pandas as pd
+        from src.stock_calculator import fetch_prices_batch
+
+        # Arrange
+        index_dates = pd.to_datetime(['2025-01-06', '2025-04-01'])  # Trading dates
+        mock_download.return_value = pd.DataFrame({('AAPL', 'Close'): [150.25, 170.5]}, index=index_dates)
+
+        # Act
+        dict_prices: Dict[str, Dict[str, Any]] = fetch_prices_batch(['AAPL'], '01-Apr-25', '06-Jan-25')
+
+        # Assert
+        assert mock_download.call_args[1]['start'] == '2025-01-06'
+        assert mock_download.call_args[1]['end'] == '2025-04-06'
+        assert dict_prices['AAPL'] == {"b_valid": True, "n_start_price": 170.5, "n_end_price": 150.25}
+
+    @patch('src.stock_calculator.yfinance.Ticker')
+    @patch('src.stock_calculator.yfinance.download')
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
+    def test_fetch_prices_batch_splits_into_batches(self, mock_download: Mock, mock_ticker_class: Mock) -> None:
+        """Test that tickers are downloaded in batches of YFINANCE_BATCH_SIZE."""
+        import pandas as pd
+        from src.stock_calculator import fetch_prices_batch, YFINANCE_BATCH_SIZE
+
+        # Arrange
+        list_s_tickers: List[str] = [f'T{n_index}' for n_index in range(YFINANCE_BATCH_SIZE + 1)]  # One more than a batch
+        mock_download.return_value = pd.DataFrame()
+        mock_ticker_class.return_value = SimpleNamespace(history=lambda **kwargs: pd.DataFrame())  # Unknown tickers, Yahoo reachable
+
+        # Act
+        dict_prices: Dict[str, Dict[str, Any]] = fetch_prices_batch(list_s_tickers, '06-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert mock_download.call_count == 2
+        assert all(not dict_price['b_valid'] for dict_price in dict_prices.values())
+
+    @patch('src.stock_calculator.time.sleep')
+    @patch('src.stock_calculator.yfinance.Ticker')
+    @patch('src.stock_calculator.yfinance.download')
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
+    def test_fetch_prices_batch_raises_api_error_when_rate_limited(self, mock_download: Mock, mock_ticker_class: Mock, mock_sleep: Mock) -> None:
+        """Test that a rate-limited batch download is retried and reported instead of marking tickers invalid."""
+        import pandas as pd
+        from src.stock_calculator import fetch_prices_batch, ApiError
+        from yfinance.exceptions import YFRateLimitError
+
+        # Arrange - yfinance.download swallows the rate limit and returns no data
+        mock_download.return_value = pd.DataFrame({('AAPL', 'Close'): [float('nan')]}, index=pd.to_datetime(['2025-01-06']))
+        mock_ticker: Mock = Mock()
+        mock_ticker.history.side_effect = YFRateLimitError()
+        mock_ticker_class.return_value = mock_ticker
+
+        # Act & Assert
+        with pytest.raises(ApiError, match='Yahoo Finance unavailable'):
+            fetch_prices_batch(['AAPL', 'MSFT'], '06-Jan-25', '01-Apr-25')
+        assert mock_download.call_count == 4
+        assert [call_sleep[0][0] for call_sleep in mock_sleep.call_args_list] == [2.0, 4.0, 8.0]
 
 
 # Exchange Priority Result Selection Tests
 
+# OpenFIGI Search API results for the real-world scenarios (read-only, shared between tests)
+TUPLE_SHELL_PLC_RESULTS: Tuple[Mapping[str, str], ...] = (
+    MappingProxyType({'ticker': 'RDSBEUR', 'exchCode': 'XS', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'}),
+    MappingProxyType({'ticker': 'RDSB', 'exchCode': 'SW', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'}),
+    MappingProxyType({'ticker': 'SHEL', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'}),
+    MappingProxyType({'ticker': 'SHELL', 'exchCode': 'NA', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'})
+)
+TUPLE_MICROSOFT_NO_LN_RESULTS: Tuple[Mapping[str, str], ...] = (
+    MappingProxyType({'ticker': 'MSF', 'exchCode': 'GF', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'MICROSOFT CORP'}),
+    MappingProxyType({'ticker': 'MSFT', 'exchCode': 'US', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'MICROSOFT CORP'})
+)
+TUPLE_MICROSOFT_RESULTS: Tuple[Mapping[str, str], ...] = TUPLE_MICROSOFT_NO_LN_RESULTS + (
+    MappingProxyType({'ticker': 'MSFT', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'MICROSOFT CORP'}),
+)
+
+
 class TestSelectAndValidateBestResult:
     """Tests for select_and_validate_best_result() exchange priority algorithm with yfinance validation."""
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_prioritizes_uk_over_us_exchange(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_prioritizes_uk_over_us_exchange(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that UK exchange (LN) is prioritized over US exchanges."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "GBP"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -778,18 +951,15 @@ class TestSelectAndValidateBestResult:
         # Assert
         assert dict_result['exchCode'] == 'LN'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_prioritizes_us_over_germany_exchange(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_prioritizes_us_over_germany_exchange(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that US exchange is prioritized over German exchanges."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "USD"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -818,18 +988,15 @@ class TestSelectAndValidateBestResult:
         # Assert
         assert dict_result['exchCode'] == 'US'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_skips_result_with_invalid_security_type(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_skips_result_with_invalid_security_type(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that results with invalid security types are skipped."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "USD"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -859,18 +1026,15 @@ class TestSelectAndValidateBestResult:
         assert dict_result['ticker'] == 'AAPL'
         assert dict_result['exchCode'] == 'US'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_skips_result_with_unsupported_exchange(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_skips_result_with_unsupported_exchange(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that results with unsupported exchange codes are skipped."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "GBP"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -899,18 +1063,15 @@ class TestSelectAndValidateBestResult:
         # Assert - should skip XS and return LN
         assert dict_result['exchCode'] == 'LN'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_skips_result_where_query_not_in_name(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_skips_result_where_query_not_in_name(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that results where search query is not in name are skipped."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "GBP"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -940,141 +1101,44 @@ class TestSelectAndValidateBestResult:
         assert dict_result['ticker'] == 'SHEL'
         assert dict_result['name'] == 'SHELL PLC'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_accepts_common_stock_security_type(self, mock_validate: MagicMock) -> None:
-        """Test that Common Stock security type is accepted."""
+    @pytest.mark.parametrize('dict_candidate, s_query', [
+        pytest.param(
+            {'ticker': 'AAPL', 'exchCode': 'US', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'APPLE INC'},
+            'Apple Inc',
+            id='common_stock'
+        ),
+        pytest.param(
+            {'ticker': 'SPG', 'exchCode': 'US', 'securityType': 'REIT', 'securityType2': 'REIT', 'name': 'SIMON PROPERTY GROUP INC'},
+            'Simon Property Group Inc',
+            id='reit'
+        ),
+        pytest.param(
+            {'ticker': 'SPY', 'exchCode': 'US', 'securityType': 'ETP', 'securityType2': 'ETP', 'name': 'SPDR S&P 500 ETF TRUST'},
+            'SPDR S&P 500 ETF',
+            id='etp'
+        ),
+        pytest.param(
+            {'ticker': 'AAPL', 'exchCode': 'US', 'securityType': '', 'securityType2': 'Common Stock', 'name': 'APPLE INC'},
+            'Apple Inc',
+            id='security_type2_only'  # securityType is blank, but securityType2 has valid value
+        )
+    ])
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_accepts_valid_security_type(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock, dict_candidate: Dict[str, Any], s_query: str) -> None:
+        """Test that Common Stock, REIT and ETP are accepted, checking securityType2 as well as securityType."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
-
-        # Arrange
-        list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'AAPL',
-                'exchCode': 'US',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'APPLE INC'
-            }
-        ]
-        s_query: str = 'Apple Inc'  # Search query
-        s_start_date: str = '01-Oct-25'  # Start date
-        s_end_date: str = '01-Jan-26'  # End date
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "USD"
 
         # Act
-        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
+        dict_result: Dict[str, Any] = select_and_validate_best_result([dict_candidate], s_query, '01-Oct-25', '01-Jan-26')
 
         # Assert
         assert dict_result is not None
-        assert dict_result['ticker'] == 'AAPL'
-
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_accepts_reit_security_type(self, mock_validate: MagicMock) -> None:
-        """Test that REIT security type is accepted."""
-        from src.stock_calculator import select_and_validate_best_result
-
-        # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
-
-        # Arrange
-        list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'SPG',
-                'exchCode': 'US',
-                'securityType': 'REIT',
-                'securityType2': 'REIT',
-                'name': 'SIMON PROPERTY GROUP INC'
-            }
-        ]
-        s_query: str = 'Simon Property Group Inc'  # Search query
-        s_start_date: str = '01-Oct-25'  # Start date
-        s_end_date: str = '01-Jan-26'  # End date
-
-        # Act
-        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
-
-        # Assert
-        assert dict_result is not None
-        assert dict_result['ticker'] == 'SPG'
-
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_accepts_etp_security_type(self, mock_validate: MagicMock) -> None:
-        """Test that ETP security type is accepted."""
-        from src.stock_calculator import select_and_validate_best_result
-
-        # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
-
-        # Arrange
-        list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'SPY',
-                'exchCode': 'US',
-                'securityType': 'ETP',
-                'securityType2': 'ETP',
-                'name': 'SPDR S&P 500 ETF TRUST'
-            }
-        ]
-        s_query: str = 'SPDR S&P 500 ETF'  # Search query
-        s_start_date: str = '01-Oct-25'  # Start date
-        s_end_date: str = '01-Jan-26'  # End date
-
-        # Act
-        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
-
-        # Assert
-        assert dict_result is not None
-        assert dict_result['ticker'] == 'SPY'
-
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_checks_security_type2_field(self, mock_validate: MagicMock) -> None:
-        """Test that securityType2 field is also checked for valid types."""
-        from src.stock_calculator import select_and_validate_best_result
-
-        # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
-
-        # Arrange - securityType is blank, but securityType2 has valid value
-        list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'AAPL',
-                'exchCode': 'US',
-                'securityType': '',
-                'securityType2': 'Common Stock',
-                'name': 'APPLE INC'
-            }
-        ]
-        s_query: str = 'Apple Inc'  # Search query
-        s_start_date: str = '01-Oct-25'  # Start date
-        s_end_date: str = '01-Jan-26'  # End date
-
-        # Act
-        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
-
-        # Assert
-        assert dict_result is not None
-        assert dict_result['ticker'] == 'AAPL'
+        assert dict_result['ticker'] == dict_candidate['ticker']
 
     def test_returns_none_when_no_match_found(self) -> None:
         """Test that None is returned when no results pass the filter (all unsupported exchanges)."""
@@ -1123,18 +1187,15 @@ class TestSelectAndValidateBestResult:
         # Assert
         assert dict_result is None
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_case_insensitive_name_matching(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_case_insensitive_name_matching(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that name matching is case insensitive."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "GBP"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -1157,18 +1218,15 @@ class TestSelectAndValidateBestResult:
         assert dict_result is not None
         assert dict_result['ticker'] == 'SHEL'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_partial_name_matching(self, mock_validate: MagicMock) -> None:
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_partial_name_matching(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
         """Test that partial name matching works (query substring of name)."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "GBP"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
         # Arrange
         list_dict_results: List[Dict[str, Any]] = [
@@ -1191,83 +1249,51 @@ class TestSelectAndValidateBestResult:
         assert dict_result is not None
         assert dict_result['ticker'] == 'SHEL'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_shell_plc_returns_shel_on_ln(self, mock_validate: MagicMock) -> None:
-        """Test real-world scenario: Shell PLC should return SHEL on LN exchange."""
+    @pytest.mark.parametrize('tuple_dict_results, s_query, s_expected_ticker, s_expected_exchange_code', [
+        pytest.param(TUPLE_SHELL_PLC_RESULTS, 'Shell PLC', 'SHEL', 'LN', id='shell_ln_wins'),  # UK exchange has highest priority
+        pytest.param(TUPLE_MICROSOFT_RESULTS, 'Microsoft Corp', 'MSFT', 'LN', id='msft_ln_wins'),  # UK before US
+        pytest.param(TUPLE_MICROSOFT_NO_LN_RESULTS, 'Microsoft Corp', 'MSFT', 'US', id='msft_us_fallback')  # No LN listing, US is next
+    ])
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_real_world_exchange_priority(
+        self,
+        mock_fetch_batch: MagicMock,
+        mock_currency: MagicMock,
+        tuple_dict_results: Tuple[Mapping[str, str], ...],
+        s_query: str,
+        s_expected_ticker: str,
+        s_expected_exchange_code: str
+    ) -> None:
+        """Test real-world scenarios: Shell PLC and Microsoft Corp resolve to the highest priority listing."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "GBP"
-        }
-
-        # Arrange - simulate actual OpenFIGI results for Shell PLC
-        list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'RDSBEUR',
-                'exchCode': 'XS',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'SHELL PLC'
-            },
-            {
-                'ticker': 'RDSB',
-                'exchCode': 'SW',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'SHELL PLC'
-            },
-            {
-                'ticker': 'SHEL',
-                'exchCode': 'LN',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'SHELL PLC'
-            },
-            {
-                'ticker': 'SHELL',
-                'exchCode': 'NA',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'SHELL PLC'
-            }
-        ]
-        s_query: str = 'Shell PLC'  # Search query
-        s_start_date: str = '01-Oct-25'  # Start date
-        s_end_date: str = '01-Jan-26'  # End date
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
         # Act
-        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
+        dict_result: Dict[str, Any] = select_and_validate_best_result(list(tuple_dict_results), s_query, '01-Oct-25', '01-Jan-26')
 
-        # Assert - should return SHEL on LN (UK exchange has highest priority)
-        assert dict_result['ticker'] == 'SHEL'
-        assert dict_result['exchCode'] == 'LN'
+        # Assert
+        assert dict_result['ticker'] == s_expected_ticker
+        assert dict_result['exchCode'] == s_expected_exchange_code
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_microsoft_returns_msft_on_us(self, mock_validate: MagicMock) -> None:
-        """Test real-world scenario: Microsoft Corp should return MSFT on US exchange."""
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_falls_back_when_higher_priority_validation_fails(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
+        """Test that a lower priority exchange is returned when the higher priority ticker fails validation."""
         from src.stock_calculator import select_and_validate_best_result
 
-        # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
+        # Mock yfinance validation: London listing has no data, US listing is valid
+        mock_fetch_batch.return_value = {
+            'MSFT.L': {"b_valid": False},
+            'MSFT': {"b_valid": True, "n_start_price": 100.0, "n_end_price": 110.0}
         }
+        mock_currency.return_value = "USD"
 
-        # Arrange - simulate actual OpenFIGI results for Microsoft
+        # Arrange
         list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'MSF',
-                'exchCode': 'GF',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'MICROSOFT CORP'
-            },
             {
                 'ticker': 'MSFT',
                 'exchCode': 'US',
@@ -1290,47 +1316,578 @@ class TestSelectAndValidateBestResult:
         # Act
         dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
 
-        # Assert - should return MSFT on LN (UK has highest priority, before US)
-        assert dict_result['ticker'] == 'MSFT'
-        assert dict_result['exchCode'] == 'LN'
+        # Assert - LN failed validation, so US is returned
+        mock_currency.assert_called_once_with('MSFT')
+        assert dict_result['exchCode'] == 'US'
+        assert dict_result['s_full_ticker'] == 'MSFT'
+        assert dict_result['s_currency'] == 'USD'
 
-    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
-    def test_us_company_without_uk_listing_returns_us(self, mock_validate: MagicMock) -> None:
-        """Test that US company without UK listing returns US exchange."""
+
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_candidates_ordered_by_priority_then_api_order(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
+        """Test that candidates are validated in exchange priority order, keeping API order within an exchange."""
         from src.stock_calculator import select_and_validate_best_result
 
         # Mock yfinance validation to always return valid
-        mock_validate.return_value = {
-            "b_valid": True,
-            "n_start_price": 100.0,
-            "n_end_price": 110.0,
-            "s_currency": "USD"
-        }
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
 
-        # Arrange - no LN listing available
+        # Arrange
         list_dict_results: List[Dict[str, Any]] = [
-            {
-                'ticker': 'MSF',
-                'exchCode': 'GF',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'MICROSOFT CORP'
-            },
-            {
-                'ticker': 'MSFT',
-                'exchCode': 'US',
-                'securityType': 'Common Stock',
-                'securityType2': 'Common Stock',
-                'name': 'MICROSOFT CORP'
-            }
+            {'ticker': 'BP1', 'exchCode': 'GY', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'BP PLC'},
+            {'ticker': 'BP', 'exchCode': 'US', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'BP PLC'},
+            {'ticker': 'BP', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'BP PLC'},
+            {'ticker': 'BPA', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'BP PLC'}
         ]
-        s_query: str = 'Microsoft Corp'  # Search query
+        s_query: str = 'BP PLC'  # Search query
         s_start_date: str = '01-Oct-25'  # Start date
         s_end_date: str = '01-Jan-26'  # End date
 
         # Act
         dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, s_query, s_start_date, s_end_date)
 
-        # Assert - should return MSFT on US (next priority after LN)
-        assert dict_result['ticker'] == 'MSFT'
-        assert dict_result['exchCode'] == 'US'
+        # Assert
+        list_s_validated: List[str] = mock_fetch_batch.call_args[0][0]  # Tickers passed to validation
+        assert list_s_validated == ['BP.L', 'BPA.L', 'BP', 'BP1.DE']
+        assert dict_result['ticker'] == 'BP'
+        assert dict_result['exchCode'] == 'LN'
+
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_validates_candidates_in_waves(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
+        """Test that only the top candidates are downloaded, with the next wave fetched only if none is valid."""
+        from src.stock_calculator import select_and_validate_best_result
+
+        # Mock yfinance validation: only the seventh candidate has price data
+        mock_fetch_batch.side_effect = lambda list_s_tickers, s_start_date, s_end_date: {
+            s_ticker: {"b_valid": s_ticker == 'ACME6.L', "n_start_price": 100.0, "n_end_price": 110.0} for s_ticker in list_s_tickers
+        }
+        mock_currency.return_value = "GBP"
+
+        # Arrange
+        list_dict_results: List[Dict[str, Any]] = [
+            {'ticker': f'ACME{n_index}', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'Acme PLC'}
+            for n_index in range(7)
+        ]
+
+        # Act
+        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, 'Acme', '01-Oct-25', '01-Jan-26')
+
+        # Assert
+        assert mock_fetch_batch.call_count == 2
+        assert mock_fetch_batch.call_args_list[0][0][0] == [f'ACME{n_index}.L' for n_index in range(5)]
+        assert mock_fetch_batch.call_args_list[1][0][0] == ['ACME5.L', 'ACME6.L']
+        assert dict_result['s_full_ticker'] == 'ACME6.L'
+
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_large_result_list_validates_only_top_wave(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
+        """Test that a London listing after many lower-priority results is found with a single download."""
+        from src.stock_calculator import select_and_validate_best_result, YFINANCE_CANDIDATE_WAVE_SIZE
+
+        # Mock yfinance validation to always return valid
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
+
+        # Arrange - 1000 unsupported (XS) and 1000 lower-priority (NA) listings ahead of the LN one
+        list_dict_results: List[Dict[str, Any]] = (
+            [{'ticker': f'RDSB{n_index}', 'exchCode': 'XS', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'} for n_index in range(1000)] +
+            [{'ticker': f'SHELL{n_index}', 'exchCode': 'NA', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'} for n_index in range(1000)] +
+            [{'ticker': 'SHEL', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'}]
+        )
+
+        # Act
+        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, 'Shell PLC', '01-Oct-25', '01-Jan-26')
+
+        # Assert - only the first wave is downloaded, led by the LN listing
+        mock_fetch_batch.assert_called_once()
+        list_s_wave_tickers: List[str] = mock_fetch_batch.call_args[0][0]  # Tickers in the only download
+        assert list_s_wave_tickers[0] == 'SHEL.L'
+        assert len(list_s_wave_tickers) == YFINANCE_CANDIDATE_WAVE_SIZE
+        assert dict_result['s_full_ticker'] == 'SHEL.L'
+
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.fetch_prices_batch')
+    def test_search_query_lowercased_once(self, mock_fetch_batch: MagicMock, mock_currency: MagicMock) -> None:
+        """Test that the search query is lowercased once per call, not once per result."""
+        from src.stock_calculator import select_and_validate_best_result
+
+        class CountingStr(str):
+            """String that counts calls to lower()."""
+
+            n_lower_calls: int = 0  # Calls to lower() across instances
+
+            def lower(self) -> str:
+                CountingStr.n_lower_calls += 1
+                return super().lower()
+
+        # Mock yfinance validation to always return valid
+        mock_fetch_batch.side_effect = fetch_prices_all_valid
+        mock_currency.return_value = "GBP"
+
+        # Arrange
+        list_dict_results: List[Dict[str, Any]] = [
+            {'ticker': f'SHEL{n_index}', 'exchCode': 'LN', 'securityType': 'Common Stock', 'securityType2': 'Common Stock', 'name': 'SHELL PLC'}
+            for n_index in range(50)
+        ]
+
+        # Act
+        dict_result: Dict[str, Any] = select_and_validate_best_result(list_dict_results, CountingStr('Shell PLC'), '01-Oct-25', '01-Jan-26')
+
+        # Assert
+        assert dict_result['ticker'] == 'SHEL0'
+        assert CountingStr.n_lower_calls == 1
+
+
+# File Cache Tests
+
+class TestFileCache:
+    """Tests for the persistent on-disk lookup cache."""
+
+    def test_set_then_get_returns_payload(self, tmp_path: Path) -> None:
+        """Test that a stored entry is returned before it expires."""
+        from src.stock_calculator import FileCache
+
+        # Arrange
+        file_cache = FileCache(str(tmp_path))  # Cache under temporary directory
+
+        # Act
+        file_cache.set('openfigi', 'US0378331005', {'s_ticker': 'AAPL'}, 60)
+        dict_payload: Dict[str, Any] = file_cache.get('openfigi', 'US0378331005')
+
+        # Assert
+        assert dict_payload == {'s_ticker': 'AAPL'}
+        assert file_cache.get('openfigi', 'US5949181045') is None
+
+    def test_entries_read_once_per_run(self, tmp_path: Path) -> None:
+        """Test that an entry loaded from disk is served from memory on later lookups."""
+        from src.stock_calculator import FileCache
+
+        # Arrange
+        FileCache(str(tmp_path)).set('openfigi', 'US0378331005', {'s_ticker': 'AAPL'}, 60)
+        file_cache = FileCache(str(tmp_path))  # Fresh cache, as on the next run
+
+        # Act
+        dict_first: Dict[str, Any] = file_cache.get('openfigi', 'US0378331005')
+        with patch('builtins.open', side_effect=OSError) as mock_open:
+            dict_second: Dict[str, Any] = file_cache.get('openfigi', 'US0378331005')
+
+        # Assert
+        assert dict_first == {'s_ticker': 'AAPL'}
+        assert dict_second == {'s_ticker': 'AAPL'}
+        mock_open.assert_not_called()
+
+    def test_expired_entry_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that an entry older than its TTL is ignored."""
+        from src.stock_calculator import FileCache
+
+        # Arrange
+        file_cache = FileCache(str(tmp_path))  # Cache under temporary directory
+        file_cache.set('yfinance', 'AAPL', {'b_valid': True}, 0)
+
+        # Act & Assert
+        assert file_cache.get('yfinance', 'AAPL') is None
+
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
+    def test_cached_lookup_skips_api_on_warm_run(self, mock_post: Mock, tmp_path: Path) -> None:
+        """Test that a successful OpenFIGI lookup is served from the cache on the next call."""
+        import src.stock_calculator as stock_calculator
+
+        # Arrange
+        mock_post.return_value = make_openfigi_response([{'data': [{'ticker': 'AAPL', 'exchCode': 'US'}]}])
+
+        with patch.object(stock_calculator, 'FILE_CACHE', stock_calculator.FileCache(str(tmp_path))):
+            # Act
+            dict_first: Dict[str, Any] = stock_calculator.lookup_ticker_from_openfigi(s_isin='US0378331005')
+            dict_second: Dict[str, Any] = stock_calculator.lookup_ticker_from_openfigi(s_isin='US0378331005')
+
+        # Assert
+        assert mock_post.call_count == 1
+        assert dict_first == dict_second
+        assert dict_second['s_ticker'] == 'AAPL'
+
+    @patch('src.stock_calculator.yfinance.Ticker')
+    @patch.dict('src.stock_calculator.DICT_TICKER_CACHE', clear=True)
+    def test_positional_and_keyword_calls_share_cache_entry(self, mock_ticker_class: Mock, tmp_path: Path) -> None:
+        """Test that the cache key does not depend on whether arguments are passed by keyword."""
+        import pandas as pd
+        import src.stock_calculator as stock_calculator
+
+        # Arrange
+        index_dates = pd.to_datetime(['2025-01-06', '2025-04-01'])  # Trading dates
+        mock_ticker: Mock = Mock()
+        mock_ticker.history.return_value = pd.DataFrame({'Close': [150.25, 170.5]}, index=index_dates)
+        mock_ticker.get_history_metadata.return_value = {'currency': 'USD'}
+        mock_ticker_class.return_value = mock_ticker
+
+        with patch.object(stock_calculator, 'FILE_CACHE', stock_calculator.FileCache(str(tmp_path))):
+            # Act
+            dict_first: Dict[str, Any] = stock_calculator.validate_ticker_and_fetch_prices('AAPL', '06-Jan-25', '01-Apr-25')
+            dict_second: Dict[str, Any] = stock_calculator.validate_ticker_and_fetch_prices('AAPL', s_start_date='06-Jan-25', s_end_date='01-Apr-25')
+
+        # Assert
+        assert mock_ticker.history.call_count == 1
+        assert dict_first == dict_second
+
+    def test_prices_for_today_get_short_ttl(self) -> None:
+        """Test that prices for a trading day that has not closed are only cached for minutes."""
+        from datetime import datetime, timedelta
+        from src.stock_calculator import get_price_cache_ttl_seconds, CACHE_TTL_OPEN_PRICES_SECONDS, CACHE_TTL_RECENT_PRICES_SECONDS, CACHE_TTL_HISTORICAL_PRICES_SECONDS, DATE_FORMAT
+
+        # Arrange
+        s_today: str = datetime.now().strftime(DATE_FORMAT)  # Today, whose close is not final
+        s_last_week_weekday: str = next(
+            dt_day for dt_day in (datetime.now() - timedelta(days=n_days) for n_days in range(2, 6)) if dt_day.weekday() < 5
+        ).strftime(DATE_FORMAT)  # Recent weekday that has already closed
+
+        # Act & Assert
+        assert get_price_cache_ttl_seconds('AAPL', '06-Jan-25', s_today) == CACHE_TTL_OPEN_PRICES_SECONDS
+        assert get_price_cache_ttl_seconds('AAPL', '06-Jan-25', s_last_week_weekday) == CACHE_TTL_RECENT_PRICES_SECONDS
+        assert get_price_cache_ttl_seconds('AAPL', '06-Jan-25', '01-Apr-25') == CACHE_TTL_HISTORICAL_PRICES_SECONDS
+
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
+    def test_not_found_lookup_is_not_cached(self, mock_post: Mock, tmp_path: Path) -> None:
+        """Test that failed lookups are not stored, so they are retried on the next run."""
+        import src.stock_calculator as stock_calculator
+
+        # Arrange
+        mock_post.return_value = make_openfigi_response([{'warning': 'No identifier found.'}])
+
+        with patch.object(stock_calculator, 'FILE_CACHE', stock_calculator.FileCache(str(tmp_path))):
+            # Act
+            stock_calculator.lookup_ticker_from_openfigi(s_isin='US0000000002')
+            stock_calculator.lookup_ticker_from_openfigi(s_isin='US0000000002')
+
+        # Assert
+        assert mock_post.call_count == 2
+
+
+    @patch('src.stock_calculator.yfinance.download')
+    def test_batched_prices_served_from_cache_on_warm_run(self, mock_download: Mock, tmp_path: Path) -> None:
+        """Test that tickers priced by a batched download are not downloaded again on the next run."""
+        import src.stock_calculator as stock_calculator
+        import pandas as pd
+
+        # Arrange
+        index_dates = pd.to_datetime(['2025-01-06', '2025-04-01'])  # Trading dates
+        mock_download.return_value = pd.DataFrame(
+            {('AAPL', 'Close'): [150.0, 165.0]},
+            index=index_dates
+        )
+
+        with patch.object(stock_calculator, 'FILE_CACHE', stock_calculator.FileCache(str(tmp_path))):
+            # Act
+            dict_first: Dict[str, Dict[str, Any]] = stock_calculator.fetch_prices_batch(['AAPL'], '06-Jan-25', '01-Apr-25')
+            dict_second: Dict[str, Dict[str, Any]] = stock_calculator.fetch_prices_batch(['AAPL'], '06-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert mock_download.call_count == 1
+        assert dict_first == dict_second
+        assert dict_second['AAPL']['n_end_price'] == 165.0
+
+
+# Batch Ticker Resolution Tests
+
+class TestBatchTickerResolution:
+    """Tests for concurrent, rate-limited batch ticker resolution."""
+
+    @patch('src.stock_calculator.time.sleep')
+    @patch('src.stock_calculator.time.monotonic')
+    def test_rate_limiter_blocks_when_window_is_full(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        """Test that acquire() waits once the window's request allowance is used up."""
+        from src.stock_calculator import RateLimiter
+
+        # Arrange
+        rate_limiter = RateLimiter(2, 0.2)  # Two requests per 0.2 seconds
+        mock_monotonic.side_effect = [100.0, 100.05, 100.1, 100.2]  # Third request arrives while the window is full
+
+        # Act
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+        n_sleeps_after_two: int = mock_sleep.call_count  # Sleeps before the window filled
+        rate_limiter.acquire()
+
+        # Assert - the third request waits until the first leaves the window
+        assert n_sleeps_after_two == 0
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(0.1)
+
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
+    def test_batch_responses_stitched_back_in_input_order(self, mock_post: Mock, mock_validate: Mock, mock_currency: Mock) -> None:
+        """Test that results from concurrently issued batches map back to the original stock order."""
+        from src.stock_calculator import resolve_tickers_batch_with_prices
+
+        # Arrange
+        list_dict_stocks: List[Dict[str, str]] = [
+            {'s_name': f'Stock {n_index}', 's_ticker': '', 's_isin': make_isin(f'US{n_index:09d}')} for n_index in range(12)
+        ]
+        list_dict_stocks.insert(5, {'s_name': 'Microsoft Corp', 's_ticker': 'MSFT', 's_isin': ''})
+
+        def post_side_effect(s_url: str, **kwargs: Any) -> Mock:
+            return make_openfigi_response([
+                {'data': [{'ticker': f"T{dict_query['idValue'][-3:-1]}", 'exchCode': 'US'}]} for dict_query in kwargs['json']
+            ])
+
+        mock_post.side_effect = post_side_effect
+        mock_validate.side_effect = lambda s_ticker, s_start_date, s_end_date: {
+            'b_valid': s_ticker != 'T03', 'n_start_price': 1.0, 'n_end_price': 2.0, 's_currency': 'USD'
+        }
+
+        # Act
+        list_dict_results: List[Dict[str, Any]] = resolve_tickers_batch_with_prices(list_dict_stocks, '01-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert mock_post.call_count == 2
+        assert mock_validate.call_count == 12
+        mock_currency.assert_not_called()
+        assert list_dict_results[5]['b_skipped'] is True
+        assert list_dict_results[0]['s_currency'] == 'USD'
+        list_s_tickers: List[str] = [dict_result['s_ticker'] for dict_result in list_dict_results if not dict_result['b_skipped']]
+        assert list_s_tickers == ['' if n_index == 3 else f'T{n_index:02d}' for n_index in range(12)]
+        assert list_dict_results[3]['b_not_found'] is True
+
+    @patch('src.stock_calculator.time.sleep')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
+    def test_mapping_batch_retries_after_rate_limit_reset(self, mock_post: Mock, mock_sleep: Mock) -> None:
+        """Test that a 429 response is retried after the ratelimit-reset wait."""
+        from src.stock_calculator import post_openfigi_mapping_batch
+
+        # Arrange
+        mock_post.side_effect = [
+            make_openfigi_response({'error': 'Too Many Requests'}, n_status_code=429, dict_headers={'ratelimit-reset': '7'}),
+            make_openfigi_response([{'data': [{'ticker': 'AAPL', 'exchCode': 'US'}]}])
+        ]
+
+        # Act
+        list_dict_response: List[Dict[str, Any]] = post_openfigi_mapping_batch([{'idType': 'ID_ISIN', 'idValue': 'US0378331005'}])
+
+        # Assert
+        mock_sleep.assert_called_once_with(7.0)
+        assert mock_post.call_count == 2
+        assert list_dict_response[0]['data'][0]['ticker'] == 'AAPL'
+
+    @patch('src.stock_calculator.time.sleep')
+    @patch('src.stock_calculator.OPENFIGI_SESSION.post')
+    def test_mapping_batch_rate_limit_without_reset_raises(self, mock_post: Mock, mock_sleep: Mock) -> None:
+        """Test that a 429 response without a usable reset wait raises ApiError."""
+        from src.stock_calculator import post_openfigi_mapping_batch, ApiError
+
+        # Arrange
+        mock_post.return_value = make_openfigi_response({'error': 'Too Many Requests'}, n_status_code=429)
+
+        # Act & Assert
+        with pytest.raises(ApiError, match='rate limit exceeded'):
+            post_openfigi_mapping_batch([{'idType': 'ID_ISIN', 'idValue': 'US0378331005'}])
+        mock_sleep.assert_not_called()
+
+    @patch('src.stock_calculator.resolve_ticker_with_prices')
+    def test_name_lookups_keep_input_order(self, mock_resolve: Mock) -> None:
+        """Test that name lookups run on worker threads but results map back to the original stock order."""
+        from src.stock_calculator import resolve_tickers_batch_with_prices
+
+        # Arrange
+        list_dict_stocks: List[Dict[str, str]] = [
+            {'s_name': 'Shell PLC', 's_ticker': '', 's_isin': ''},
+            {'s_name': 'Apple Inc', 's_ticker': 'AAPL', 's_isin': ''},
+            {'s_name': 'BP PLC', 's_ticker': '', 's_isin': ''},
+            {'s_name': 'Unknown Co', 's_ticker': '', 's_isin': ''}
+        ]
+        dict_dict_lookups: Dict[str, Dict[str, Any]] = {
+            'Shell PLC': {'s_ticker': 'SHEL', 's_exchange_code': 'LN', 's_full_ticker': 'SHEL.L', 'b_not_found': False},
+            'BP PLC': {'s_ticker': 'BP', 's_exchange_code': 'LN', 's_full_ticker': 'BP.L', 'b_not_found': False},
+            'Unknown Co': {'s_ticker': '', 's_exchange_code': '', 's_full_ticker': '', 'b_not_found': True}
+        }
+        mock_resolve.side_effect = lambda s_name, s_start_date, s_end_date: dict_dict_lookups[s_name]
+
+        # Act
+        list_dict_results: List[Dict[str, Any]] = resolve_tickers_batch_with_prices(list_dict_stocks, '01-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert [dict_result['s_full_ticker'] for dict_result in list_dict_results] == ['SHEL.L', '', 'BP.L', '']
+        assert list_dict_results[1]['b_skipped'] is True
+        assert list_dict_results[3]['b_not_found'] is True
+
+    @patch('src.stock_calculator.resolve_ticker_with_prices')
+    def test_name_lookups_run_concurrently(self, mock_resolve: Mock) -> None:
+        """Test that up to five name lookups (one Search API window) are in flight at once."""
+        from src.stock_calculator import resolve_tickers_batch_with_prices
+        import threading
+
+        # Arrange
+        barrier_lookups = threading.Barrier(5, timeout=5)  # Released only when five lookups run together
+        list_dict_stocks: List[Dict[str, str]] = [{'s_name': f'Stock {n_index}', 's_ticker': '', 's_isin': ''} for n_index in range(5)]
+
+        def resolve_side_effect(s_name: str, s_start_date: str, s_end_date: str) -> Dict[str, Any]:
+            barrier_lookups.wait()
+            return {'s_ticker': s_name, 's_exchange_code': 'US', 's_full_ticker': s_name, 'b_not_found': False}
+
+        mock_resolve.side_effect = resolve_side_effect
+
+        # Act
+        list_dict_results: List[Dict[str, Any]] = resolve_tickers_batch_with_prices(list_dict_stocks, '01-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert [dict_result['s_ticker'] for dict_result in list_dict_results] == [f'Stock {n_index}' for n_index in range(5)]
+
+    @patch('src.stock_calculator.resolve_ticker_with_prices')
+    def test_name_lookup_api_error_propagates(self, mock_resolve: Mock) -> None:
+        """Test that an OpenFIGI error from a worker thread is raised to the caller."""
+        from src.stock_calculator import resolve_tickers_batch_with_prices, ApiError
+
+        # Arrange
+        list_dict_stocks: List[Dict[str, str]] = [{'s_name': 'Shell PLC', 's_ticker': '', 's_isin': ''}]
+        mock_resolve.side_effect = ApiError('OpenFIGI Search API rate limit exceeded.')
+
+        # Act & Assert
+        with pytest.raises(ApiError):
+            resolve_tickers_batch_with_prices(list_dict_stocks, '01-Jan-25', '01-Apr-25')
+
+
+    @patch('src.stock_calculator.resolve_ticker_with_prices')
+    def test_name_lookup_api_error_not_delayed_by_running_lookups(self, mock_resolve: Mock) -> None:
+        """Test that an OpenFIGI error is raised without waiting for lookups still in progress."""
+        import threading
+        from src.stock_calculator import resolve_tickers_batch_with_prices, ApiError
+
+        # Arrange - the second lookup blocks, as a worker waiting on the rate limiter would
+        event_release: threading.Event = threading.Event()  # Releases the blocked lookup
+        event_started: threading.Event = threading.Event()  # Set once the blocked lookup is running
+        event_finished: threading.Event = threading.Event()  # Set once the blocked lookup returns
+        list_dict_stocks: List[Dict[str, str]] = [
+            {'s_name': 'Shell PLC', 's_ticker': '', 's_isin': ''},
+            {'s_name': 'BP PLC', 's_ticker': '', 's_isin': ''}
+        ]
+
+        def resolve_side_effect(s_name: str, s_start_date: str, s_end_date: str) -> Dict[str, Any]:
+            if s_name == 'Shell PLC':
+                event_started.wait(5)
+                raise ApiError('OpenFIGI Search API rate limit exceeded.')
+            event_started.set()
+            event_release.wait(5)
+            event_finished.set()
+            return {'b_not_found': True}
+
+        mock_resolve.side_effect = resolve_side_effect
+
+        # Act & Assert
+        try:
+            with pytest.raises(ApiError):
+                resolve_tickers_batch_with_prices(list_dict_stocks, '01-Jan-25', '01-Apr-25')
+            assert not event_finished.is_set()
+        finally:
+            event_release.set()
+
+
+# Main Processing Tests
+
+class TestMainProcessing:
+    """Tests for the main processing flow."""
+
+    @patch('src.stock_calculator.fetch_stock_currency')
+    @patch('src.stock_calculator.validate_ticker_and_fetch_prices')
+    def test_process_stock_fetches_user_ticker_with_one_call(self, mock_validate: Mock, mock_currency: Mock) -> None:
+        """Test that a user-supplied ticker gets prices and currency from a single validation call."""
+        from src.stock_calculator import process_stock
+
+        # Arrange
+        mock_validate.return_value = {'b_valid': True, 'n_start_price': 100.0, 'n_end_price': 110.0, 's_currency': 'USD'}
+        dict_stock: Dict[str, Any] = {'s_name': 'Microsoft Corp', 's_ticker': 'MSFT', 's_isin': ''}
+
+        # Act
+        dict_result, list_s_notes = process_stock(dict_stock, '04-Jan-25', '01-Apr-25')
+
+        # Assert
+        mock_validate.assert_called_once_with('MSFT', '04-Jan-25', '01-Apr-25')
+        mock_currency.assert_not_called()
+        assert dict_result['n_percentage'] == 10.0
+        assert dict_result['s_currency'] == 'USD'
+        assert list_s_notes == ['Start date adjusted to 06-Jan-25 (next trading day) for: Microsoft Corp']
+
+    @patch('src.stock_calculator.validate_ticker_and_fetch_prices', return_value={'b_valid': False})
+    def test_process_stock_reports_delisted_without_price_data(self, mock_validate: Mock) -> None:
+        """Test that a user-supplied ticker with no price data is reported as delisted."""
+        from src.stock_calculator import process_stock
+
+        # Arrange
+        dict_stock: Dict[str, Any] = {'s_name': 'First Republic Bank', 's_ticker': 'FRC', 's_isin': ''}
+
+        # Act
+        dict_result, list_s_notes = process_stock(dict_stock, '06-Jan-25', '01-Apr-25')
+
+        # Assert
+        assert dict_result['s_error'] == 'Delisted'
+        assert dict_result['n_start_price'] is None
+
+    @patch('src.stock_calculator.fetch_prices_batch')
+    @patch('src.stock_calculator.resolve_tickers_batch_with_prices')
+    def test_user_tickers_left_for_process_stock(self, mock_resolve_batch: Mock, mock_fetch_batch: Mock) -> None:
+        """Test that user-supplied tickers are not priced during resolution."""
+        from src.stock_calculator import resolve_all_tickers
+
+        # Arrange
+        mock_resolve_batch.return_value = [{'b_skipped': True}, {'b_skipped': True}]
+        list_dict_stocks: List[Dict[str, Any]] = [
+            {'s_name': 'Microsoft Corp', 's_ticker': 'MSFT', 's_isin': ''},
+            {'s_name': 'First Republic Bank', 's_ticker': 'FRC', 's_isin': ''}
+        ]
+
+        # Act
+        list_dict_resolved: List[Dict[str, Any]] = resolve_all_tickers(list_dict_stocks, '06-Jan-25', '01-Apr-25')
+
+        # Assert
+        mock_fetch_batch.assert_not_called()
+        assert 'n_start_price' not in list_dict_resolved[0]
+        assert 'n_start_price' not in list_dict_resolved[1]
+
+    def test_module_import_defers_yfinance(self) -> None:
+        """Test that importing the module does not import yfinance until prices are fetched."""
+        import subprocess
+        import sys
+
+        # Arrange
+        s_script: str = "import sys; import src.stock_calculator; print('yfinance' in sys.modules)"  # Check run in a fresh interpreter
+        s_repo_path: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Repository root
+
+        # Act
+        process_result = subprocess.run([sys.executable, '-c', s_script], cwd=s_repo_path, capture_output=True, text=True, check=True)
+
+        # Assert
+        assert process_result.stdout.strip() == 'False'
+
+    @patch('src.stock_calculator.write_output_csv')
+    @patch('src.stock_calculator.print_output_terminal')
+    @patch('src.stock_calculator.generate_output_filename', return_value='output.csv')
+    @patch('src.stock_calculator.resolve_all_tickers', side_effect=lambda list_dict_stocks, s_start_date, s_end_date: list_dict_stocks)
+    @patch('src.stock_calculator.process_stock')
+    def test_stocks_processed_concurrently_keep_input_order(
+        self,
+        mock_process: Mock,
+        mock_resolve: Mock,
+        mock_filename: Mock,
+        mock_print: Mock,
+        mock_write: Mock
+    ) -> None:
+        """Test that results and notes are reported in input order even when later stocks finish first."""
+        from src.stock_calculator import main
+        import time
+
+        # Arrange
+        def process_side_effect(dict_stock: Dict[str, Any], s_start_date: str, s_end_date: str) -> Any:
+            time.sleep(0.1 if dict_stock['s_name'] == 'Apple' else 0.0)  # First stock finishes last
+            return {'s_name': dict_stock['s_name']}, [f"Note for {dict_stock['s_name']}"]
+
+        mock_process.side_effect = process_side_effect
+        list_s_argv: List[str] = ['stock_calculator.py', '--stocks', 'Apple,Microsoft,Shell', '--start', '01-Jan-25', '--end', '01-Apr-25', '--no-cache']
+
+        # Act
+        with patch('sys.argv', list_s_argv):
+            main()
+
+        # Assert
+        list_dict_results: List[Dict[str, Any]] = mock_print.call_args[0][2]  # Results passed to terminal output
+        list_s_notes: List[str] = mock_print.call_args[0][3]  # Notes passed to terminal output
+        assert [dict_result['s_name'] for dict_result in list_dict_results] == ['Apple', 'Microsoft', 'Shell']
+        assert list_s_notes == ['Note for Apple', 'Note for Microsoft', 'Note for Shell']